@@ -31,34 +31,29 @@ Key Concepts:
 AutoGen Version: 0.5+
 """
 
-# Standard library imports
-import asyncio
-import sys
-from pathlib import Path
-
-# Third-party imports
-from autogen_agentchat.agents import AssistantAgent
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import get_openai_config
-
-# Load OpenAI API configuration
-config = get_openai_config()
-
-# Create a basic assistant agent
-openai_client = OpenAIChatCompletionClient(
-    model=config['model'],
-    api_key=config['api_key'],
-)
-assistant = AssistantAgent(
-    name="BasicAssistant",    
-    model_client=openai_client,
-    system_message="You are a helpful assistant."
-)
-
-# Send a message and get a response
-response = asyncio.run(assistant.run(task="What is AutoGen?"))
-print("\nAssistant’s response:")
-print(response)
+from utils.runtime import run
+
+async def main() -> None:
+    # Imported here so that importing this module does not load AutoGen
+    from autogen_agentchat.agents import AssistantAgent
+    from utils.model_client import get_shared_model_client
+
+    # Create a basic assistant agent
+    openai_client = get_shared_model_client(hedge=True, max_tokens=256)
+    assistant = AssistantAgent(
+        name="BasicAssistant",    
+        model_client=openai_client,
+        system_message="You are a helpful assistant."
+    )
+
+    # Send a message and get a response
+    response = await assistant.run(task="What is AutoGen?")
+    print("\nAssistant’s response:")
+    print(response)
+
+    # Cleanup
+    await openai_client.close()
+
+if __name__ == "__main__":
+    run(main())
@@ -26,49 +26,38 @@ Key Concepts:
 - Tool function definition with type hints
 - Agent tool integration and configuration
 - Streaming responses with Console UI
-- Tool reflection and usage tracking
+- Tools that return the final, human-readable answer (no reflection call)
 - Async tool execution
 
 AutoGen Version: 0.5+
 """
 
 # Standard library imports
-import asyncio
-import sys
-from datetime import datetime
-from pathlib import Path
-
-# Third-party imports
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.ui import Console
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+import time
 
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import get_openai_config
+from utils.runtime import run
 
 # --- Define Tools (as async functions with type hints) ---
 
 async def get_current_time() -> str:
     """Return current date and time as a string."""
-    now = datetime.now()
-    return f"The current date and time is {now.strftime('%Y-%m-%d %H:%M:%S')}"
+    return f"The current date and time is {time.strftime('%Y-%m-%d %H:%M:%S')}"
 
-async def calculate_area(length: float, width: float) -> float:
+async def calculate_area(length: float, width: float) -> str:
     """Return the area of a rectangle."""
-    return length * width
+    return f"The area of the rectangle is {length * width:.2f} square units"
 
 # --- Main async function ---
 
 async def main() -> None:
-    # Load config
-    config = get_openai_config()
+    # Imported here so that importing this module does not load AutoGen
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.ui import Console
+    from utils.model_client import get_shared_model_client
 
     # Create model client
-    model_client = OpenAIChatCompletionClient(
-        model=config["model"],
-        api_key=config["api_key"]
-    )
+    model_client = get_shared_model_client(hedge=True, max_tokens=256)
 
     # Create assistant with tools
     assistant = AssistantAgent(
@@ -76,7 +65,7 @@ async def main() -> None:
         system_message="You are a helpful AI assistant that can use tools to perform tasks.",
         model_client=model_client,
         model_client_stream=True,
-        reflect_on_tool_use=True,
+        reflect_on_tool_use=False,
         tools=[get_current_time, calculate_area]
     )
 
@@ -93,4 +82,4 @@ async def main() -> None:
     await model_client.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
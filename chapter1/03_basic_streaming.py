@@ -32,29 +32,17 @@ Key Concepts:
 AutoGen Version: 0.5+
 """
 
-# Standard library imports
-import asyncio
-import sys
-from pathlib import Path
-
-# Third-party imports
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.ui import Console
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import get_openai_config
+from utils.runtime import run
 
 async def main() -> None:
-    # Load config with environment variables
-    config = get_openai_config()
+    # Imported here so that importing this module does not load AutoGen
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.ui import Console
+    from utils.model_client import get_shared_model_client
 
     # Create OpenAI client with streaming
-    model_client = OpenAIChatCompletionClient(
-        model=config["model"],
-        api_key=config["api_key"]
-    )
+    model_client = get_shared_model_client(hedge=True, max_tokens=256)
 
     # Create assistant with streaming enabled
     assistant = AssistantAgent(
@@ -75,4 +63,4 @@ async def main() -> None:
     await model_client.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -26,6 +26,7 @@ Key Concepts:
 - Multi-agent conversation patterns
 - Agent persona definition and role-playing
 - Sequential message exchange
+- Batching several turns into one JSON-mode call
 - Agent response generation
 - Conversation flow management
 
@@ -33,70 +34,86 @@ AutoGen Version: 0.5+
 """
 
 # Standard library imports
-import asyncio
-import sys
-from pathlib import Path
-
-# Third-party imports
-from autogen_agentchat.agents import AssistantAgent
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+import json
 
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
 from utils.config import get_openai_config
+from utils.runtime import run
 
-async def main() -> None:
-    # Load config
-    config = get_openai_config()
+# Load config once at import time
+CONFIG = get_openai_config()
 
-    # Create shared model client
-    model_client = OpenAIChatCompletionClient(
-        model=config["model"],
-        api_key=config["api_key"]
+async def main() -> None:
+    # Imported here so that importing this module does not load AutoGen
+    from autogen_agentchat.agents import AssistantAgent
+    from utils.model_client import get_shared_model_client
+    try:
+        from utils.semantic_cache import SemanticCache
+    except ImportError:  # numpy comes with the optional "cache" extra
+        SemanticCache = None
+
+    # Create shared model client. Both agents answer in JSON so that each one
+    # can cover two conversational turns in a single model call.
+    model_client = get_shared_model_client(
+        hedge=True, cache=True, response_format={"type": "json_object"}, max_tokens=512
     )
 
     # Create teacher and student agents with different roles
     teacher = AssistantAgent(
         name="teacher",
-        system_message="You are a knowledgeable teacher who explains concepts clearly and concisely.",
+        system_message=(
+            "You are a knowledgeable teacher who explains concepts clearly and concisely. "
+            "You will receive a question and a follow-up question as JSON. Reply with a JSON object "
+            'with the keys "answer" (answering the question) and "follow_up_answer" (answering the follow-up). '
+            "Keep each answer under 150 words."
+        ),
         model_client=model_client
     )
 
     student = AssistantAgent(
         name="student",
-        system_message="You are a curious student who asks thoughtful questions to understand concepts better.",
+        system_message=(
+            "You are a curious student who asks thoughtful questions to understand concepts better. "
+            'Reply with a JSON object with the keys "question" and "follow_up".'
+        ),
         model_client=model_client,
         model_client_stream=True
     )
 
-    print("🧑‍🏫 Starting conversation between teacher and student...\n")
+    # Reuse earlier answers for near-identical turns across re-runs, when the cache is installed
+    cache = SemanticCache(CONFIG["model"], api_key=CONFIG["api_key"]) if SemanticCache else None
 
-    # Student starts by asking a question
-    student_msg = await student.run(
-        task="What is the difference between supervised and unsupervised learning?"
-    )
-    print(f"🧑‍🎓 Student: {student_msg}\n")
+    async def run_turn(agent: AssistantAgent, task):
+        if cache is None:
+            return await agent.run(task=task)
+        return await cache.run(agent, task)
 
-    # Teacher responds
-    teacher_msg = await teacher.run(
-        task=f"Respond to this question: {student_msg}"
-    )
-    print(f"🧑‍🏫 Teacher: {teacher_msg}\n")
+    print("🧑‍🏫 Starting conversation between teacher and student...\n")
 
-    # Student asks follow-up question
-    student_followup = await student.run(
-        task=f"Based on your explanation: {teacher_msg}\nCan you give me an example of when I might use each approach?"
+    # Student asks the question and the follow-up in one call
+    student_result = await run_turn(
+        student,
+        task=(
+            "Ask: What is the difference between supervised and unsupervised learning? "
+            "As a follow-up, ask for an example of when you might use each approach."
+        )
     )
-    print(f"🧑‍🎓 Student: {student_followup}\n")
+    student_message = student_result.messages[-1]
+    questions = json.loads(student_message.content)
 
-    # Teacher responds to follow-up
-    teacher_response = await teacher.run(
-        task=f"Respond to this follow-up question: {student_followup}"
-    )
-    print(f"🧑‍🏫 Teacher: {teacher_response}\n")
+    # Teacher answers both questions in one call. The student's message is passed
+    # as-is rather than pasted into a new prompt, so its text is not sent twice.
+    teacher_result = await run_turn(teacher, task=student_message)
+    answers = json.loads(teacher_result.messages[-1].content)
+
+    # Replay the exchange as the original four-turn conversation
+    print(f"🧑‍🎓 Student: {questions['question']}\n")
+    print(f"🧑‍🏫 Teacher: {answers['answer']}\n")
+    print(f"🧑‍🎓 Student: {questions['follow_up']}\n")
+    print(f"🧑‍🏫 Teacher: {answers['follow_up_answer']}\n")
 
     # Cleanup
     await model_client.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -35,51 +35,41 @@ Key Concepts:
 AutoGen Version: 0.5+
 """
 
-import asyncio
-import sys
-from datetime import datetime
 import math
-from pathlib import Path
+import time
 from dotenv import load_dotenv
 
-# Add the project root to sys.path for utils import
-sys.path.append(str(Path(__file__).parent.parent))
-
-from utils.config import get_openai_config
-
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_agentchat.ui import Console
-from autogen_agentchat.conditions import MaxMessageTermination
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+from utils.runtime import run
 
 # ----------------------- Tool Definitions -----------------------
 
 async def get_current_time() -> str:
     """Get the current date and time."""
-    now = datetime.now()
-    return f"The current date and time is {now.strftime('%Y-%m-%d %H:%M:%S')}"
+    return f"The current date and time is {time.strftime('%Y-%m-%d %H:%M:%S')}"
 
-async def calculate_circle_area(radius: float) -> float:
+async def calculate_circle_area(radius: float) -> str:
     """Calculate the area of a circle given its radius."""
-    return math.pi * (radius ** 2)
+    return f"The area of a circle with radius {radius:g} is {math.pi * radius ** 2:.2f} square units"
 
-async def convert_temperature(celsius: float) -> float:
+async def convert_temperature(celsius: float) -> str:
     """Convert temperature from Celsius to Fahrenheit."""
-    return (celsius * 9 / 5) + 32
+    return f"{celsius:g}°C is {celsius * 9 / 5 + 32:.1f}°F"
 
 # ----------------------- Main Entry -----------------------
 
 async def main() -> None:
-    # Load OpenAI config
+    # Imported here so that importing this module does not load AutoGen
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.teams import RoundRobinGroupChat
+    from autogen_agentchat.ui import Console
+    from autogen_agentchat.conditions import MaxMessageTermination
+    from utils.model_client import get_shared_model_client
+
+    # Load environment variables
     load_dotenv()
-    config = get_openai_config()
 
     # Create shared OpenAI client
-    model_client = OpenAIChatCompletionClient(
-        model=config["model"],
-        api_key=config["api_key"]
-    )
+    model_client = get_shared_model_client(hedge=True, cache=True, max_tokens=256)
 
     # Define agents with tools and personas
     coordinator = AssistantAgent(
@@ -101,7 +91,7 @@ async def main() -> None:
         """,
         model_client=model_client,
         tools=[calculate_circle_area],
-        reflect_on_tool_use=True
+        reflect_on_tool_use=False
     )
 
     science_specialist = AssistantAgent(
@@ -112,7 +102,7 @@ async def main() -> None:
         """,
         model_client=model_client,
         tools=[convert_temperature],
-        reflect_on_tool_use=True
+        reflect_on_tool_use=False
     )
 
     # Define termination condition (12 total messages)
@@ -141,4 +131,4 @@ async def main() -> None:
     await model_client.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
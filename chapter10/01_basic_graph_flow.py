@@ -38,25 +38,42 @@ AutoGen Version: 0.5+
 """
 
 # Standard library imports
-import asyncio
 import sys
-from pathlib import Path
-
-# Third-party imports
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import DiGraphBuilder, GraphFlow
-from autogen_agentchat.conditions import MaxMessageTermination
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import get_openai_config
+from utils.runtime import run
+from utils.streaming import coalesce
+
+if TYPE_CHECKING:
+    from autogen_agentchat.teams import DiGraph
+
+@lru_cache(maxsize=None)
+def build_graph(writer: str, reviewer: str) -> "DiGraph":
+    """Build and validate the writer -> reviewer graph once per pair of agent names"""
+    from autogen_agentchat.teams import DiGraph, DiGraphEdge, DiGraphNode
+
+    graph = DiGraph(
+        nodes={
+            writer: DiGraphNode(name=writer, edges=[DiGraphEdge(target=reviewer)]),
+            reviewer: DiGraphNode(name=reviewer, edges=[]),
+        },
+        default_start_node=writer,
+    )
+    graph.graph_validate()
+    return graph
 
 async def main():
     """Run a basic sequential flow with writer and reviewer agents"""
+    # Imported here so that importing this module does not load AutoGen
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.teams import GraphFlow
+    from autogen_agentchat.conditions import MaxMessageTermination
+    from utils.model_client import get_shared_model_client
     
     # Create an OpenAI model client
-    client = OpenAIChatCompletionClient(model="gpt-4o-mini")
+    client = get_shared_model_client(hedge=True, model="gpt-4o-mini", max_tokens=256)
     
     # Create the writer agent
     writer = AssistantAgent(
@@ -72,18 +89,8 @@ async def main():
         system_message="You are an editor. Review the draft and suggest specific improvements for clarity and impact."
     )
     
-    # Build the graph: writer -> reviewer
-    builder = DiGraphBuilder()
-    builder.add_node(writer).add_node(reviewer)
-    
-    # Set writer as the entry point
-    builder.set_entry_point(writer)
-    
-    # Add edge from writer to reviewer
-    builder.add_edge(writer, reviewer)
-    
-    # Build and validate the graph
-    graph = builder.build()
+    # Build the graph: writer -> reviewer, with writer as the entry point
+    graph = build_graph(writer.name, reviewer.name)
     
     # Create the flow with a termination condition
     flow = GraphFlow(
@@ -92,9 +99,13 @@ async def main():
         termination_condition=MaxMessageTermination(5)  # Terminate after 5 messages
     )
     
-    # Run the flow
-    async for event in flow.run_stream(task="Write a short paragraph about artificial intelligence."):
-        print(f"{event}")
+    # Run the flow, printing events in batches rather than one write per event
+    events = (f"{event}\n" async for event in flow.run_stream(task="Write a short paragraph about artificial intelligence."))
+    try:
+        async for chunk in coalesce(events):
+            sys.stdout.write(chunk)
+    finally:
+        sys.stdout.flush()  # show the output so far, even if the flow fails
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run(main())
\ No newline at end of file
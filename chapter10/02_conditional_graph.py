@@ -5,7 +5,8 @@ Example 2: Conditional Graph
 Description:
 Demonstrates conditional branching workflows with decision-based routing.
 Shows how to create adaptive workflows that change execution paths based
-on agent responses and evaluation criteria.
+on agent responses and evaluation criteria. The reviewer answers in JSON
+mode and the graph branches on its parsed "decision" field.
 
 Prerequisites:
 - OpenAI API key set in .env file
@@ -33,30 +34,73 @@ Key Concepts:
 - Conditional graph construction
 - Dynamic workflow adaptation
 - Response-based flow control
+- Callable edge conditions on structured (JSON) output
 
 AutoGen Version: 0.5+
 """
 
 # Standard library imports
-import asyncio
+import json
 import sys
-from pathlib import Path
-
-# Third-party imports
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import DiGraphBuilder, GraphFlow
-from autogen_agentchat.conditions import MaxMessageTermination
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable
 
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import get_openai_config
+from utils.runtime import run
+from utils.streaming import coalesce
+
+if TYPE_CHECKING:
+    from autogen_agentchat.messages import BaseChatMessage
+    from autogen_agentchat.teams import DiGraph
+
+def decision_is(decision: str) -> Callable[["BaseChatMessage"], bool]:
+    """Build an edge condition that matches the reviewer's JSON decision"""
+    def condition(message: "BaseChatMessage") -> bool:
+        try:
+            return json.loads(message.to_model_text()).get("decision") == decision
+        except (json.JSONDecodeError, AttributeError):
+            return False
+    condition.__name__ = f"decision_is_{decision}"
+    return condition
+
+@lru_cache(maxsize=None)
+def build_graph(writer: str, reviewer: str, reviser: str, editor: str, publisher: str) -> "DiGraph":
+    """Build and validate the conditional review graph once per set of agent names"""
+    from autogen_agentchat.teams import DiGraph, DiGraphEdge, DiGraphNode
+
+    graph = DiGraph(
+        nodes={
+            writer: DiGraphNode(name=writer, edges=[DiGraphEdge(target=reviewer)]),
+            # Branch on the reviewer's parsed decision
+            reviewer: DiGraphNode(
+                name=reviewer,
+                edges=[
+                    DiGraphEdge(target=reviser, condition=decision_is("major")),
+                    DiGraphEdge(target=editor, condition=decision_is("minor")),
+                    DiGraphEdge(target=publisher, condition=decision_is("approved")),
+                ],
+            ),
+            # Continue the flow after revisions/edits
+            reviser: DiGraphNode(name=reviser, edges=[DiGraphEdge(target=reviewer)]),  # Reviser sends back to reviewer
+            editor: DiGraphNode(name=editor, edges=[DiGraphEdge(target=publisher)]),  # Editor sends to publisher
+            publisher: DiGraphNode(name=publisher, edges=[]),
+        },
+        default_start_node=writer,
+    )
+    graph.graph_validate()
+    return graph
 
 async def main():
     """Run a conditional branching flow with different paths based on review feedback"""
+    # Imported here so that importing this module does not load AutoGen
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.teams import GraphFlow
+    from autogen_agentchat.conditions import MaxMessageTermination
+    from utils.model_client import get_shared_model_client
     
-    # Create an OpenAI model client
-    client = OpenAIChatCompletionClient(model="gpt-4o-mini")
+    # Create OpenAI model clients, with output budgets sized to each role
+    client = get_shared_model_client(hedge=True, model="gpt-4o-mini", max_tokens=256)
+    rewrite_client = get_shared_model_client(hedge=True, model="gpt-4o-mini", max_tokens=400)
     
     # Create the writer agent
     writer = AssistantAgent(
@@ -65,69 +109,50 @@ async def main():
         system_message="You are a professional writer. Draft content based on the given topic. Write a clear, well-structured paragraph."
     )
     
-    # Create the reviewer agent with instructions to use specific phrases
+    # Create the reviewer agent, which replies with a JSON decision
     reviewer = AssistantAgent(
         "reviewer", 
-        model_client=client, 
+        model_client=get_shared_model_client(hedge=True, model="gpt-4o-mini", response_format={"type": "json_object"}, max_tokens=200), 
         system_message="""You are an editor who reviews content.
-        You must use one of these exact phrases in your response:
-        - 'major revision needed' (if content needs significant improvements)
-        - 'minor edits suggested' (if content is good with minor changes)
-        - 'approved as is' (if content is excellent)
-        
-        Be specific in your feedback and always include one of these phrases."""
+        Reply with a JSON object with two keys:
+        - "decision": one of "major" (content needs significant improvements),
+          "minor" (content is good with minor changes) or "approved" (content is excellent)
+        - "feedback": your specific feedback on the content"""
     )
     
     # Create the reviser agent
     reviser = AssistantAgent(
         "reviser", 
-        model_client=client, 
+        model_client=rewrite_client, 
         system_message="You are a content reviser. Make substantial improvements to the content based on the reviewer's feedback. After making changes, clearly state what you've improved."
     )
     
     # Create the editor agent
     editor = AssistantAgent(
         "editor", 
-        model_client=client, 
+        model_client=rewrite_client, 
         system_message="You are a copy editor. Make minor edits and polish the content based on the reviewer's feedback. After making changes, clearly state what you've edited."
     )
     
     # Create the publisher agent
     publisher = AssistantAgent(
         "publisher", 
-        model_client=client, 
+        model_client=rewrite_client, 
         system_message="You are a publisher. Format the approved content for publication and add a publication note. Include 'PUBLICATION COMPLETE' at the end of your response."
     )
     
     # Build the graph with conditional branches
-    builder = DiGraphBuilder()
-    
-    # Add all nodes
-    builder.add_node(writer).add_node(reviewer)
-    builder.add_node(reviser).add_node(editor).add_node(publisher)
-    
-    # Set writer as the entry point
-    builder.set_entry_point(writer)
-    
-    # Add edges with string conditions
-    builder.add_edge(writer, reviewer)
-    
-    # Use individual add_edge calls with condition parameter for conditional branching
-    builder.add_edge(reviewer, reviser, condition="major revision needed")
-    builder.add_edge(reviewer, editor, condition="minor edits suggested")
-    builder.add_edge(reviewer, publisher, condition="approved as is")
-    
-    # Continue the flow after revisions/edits
-    builder.add_edge(reviser, reviewer)  # Reviser sends back to reviewer
-    builder.add_edge(editor, publisher)  # Editor sends to publisher
-    
-    # Build and validate the graph
-    graph = builder.build()
+    graph = build_graph(writer.name, reviewer.name, reviser.name, editor.name, publisher.name)
     
     print("Graph structure:")
     print(f"Nodes: {[node for node in graph.nodes]}")
-    print(f"Entry point: {graph.entry_point}")
-    print(f"Edges: {[(edge.source, edge.target, edge.condition) for edge in graph.edges]}")
+    print(f"Entry point: {graph.get_start_nodes()}")
+    edges = [
+        (node.name, edge.target, edge.condition_function.__name__ if edge.condition_function else edge.condition)
+        for node in graph.nodes.values()
+        for edge in node.edges
+    ]
+    print(f"Edges: {edges}")
     print("-" * 50)
     
     # Create the flow with a termination condition
@@ -143,12 +168,17 @@ async def main():
     print("=" * 50)
     
     try:
-        async for event in flow.run_stream(task=scenario):
-            print(f"Event: {event}")
+        # Print events in batches rather than one write per event
+        events = (f"Event: {event}\n" async for event in flow.run_stream(task=scenario))
+        try:
+            async for chunk in coalesce(events):
+                sys.stdout.write(chunk)
+        finally:
+            sys.stdout.flush()  # the output so far goes out before the error report
     except Exception as e:
         print(f"Error during flow execution: {e}")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -5,7 +5,8 @@ Example 3: Parallel Flow
 Description:
 Demonstrates parallel execution patterns where multiple agents work
 concurrently on different aspects of the same task. Shows how to
-coordinate simultaneous agent activities and aggregate results.
+coordinate simultaneous agent activities with asyncio.gather and
+aggregate their results in a synthesizer agent.
 
 Prerequisites:
 - OpenAI API key set in .env file
@@ -39,89 +40,68 @@ AutoGen Version: 0.5+
 
 # Standard library imports
 import asyncio
-import sys
-from pathlib import Path
-
-# Third-party imports
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import DiGraphBuilder, GraphFlow
-from autogen_agentchat.conditions import MaxMessageTermination
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import get_openai_config
+from utils.runtime import run
 
 async def main():
-    """Run a parallel execution flow where multiple agents work concurrently"""
-    
     """Run a parallel execution flow where multiple agents work concurrently."""
+    # Imported here so that importing this module does not load AutoGen
+    from autogen_agentchat.agents import AssistantAgent
+    from utils.model_client import get_shared_model_client
     
     # Create an OpenAI model client
-    config = get_openai_config()
-    client = OpenAIChatCompletionClient(**config)
+    client = get_shared_model_client(hedge=True, max_tokens=256)
     
     # Create specialized research agents
     tech_researcher = AssistantAgent(
         "tech_researcher", 
         model_client=client, 
-        system_message="You are a technology researcher. Research and provide insights on the technical aspects of the given topic."
+        system_message="You are a technology researcher. Research and provide insights on the technical aspects of the given topic. Keep your insights under 150 words."
     )
     
     market_researcher = AssistantAgent(
         "market_researcher", 
         model_client=client, 
-        system_message="You are a market researcher. Research and provide insights on the market aspects of the given topic."
+        system_message="You are a market researcher. Research and provide insights on the market aspects of the given topic. Keep your insights under 150 words."
     )
     
     social_researcher = AssistantAgent(
         "social_researcher", 
         model_client=client, 
-        system_message="You are a social impact researcher. Research and provide insights on the social implications of the given topic."
+        system_message="You are a social impact researcher. Research and provide insights on the social implications of the given topic. Keep your insights under 150 words."
     )
-   
-    
-    
-
-  
-
     
     # Create the synthesizer agent
     synthesizer = AssistantAgent(
         "synthesizer", 
-        model_client=client, 
+        model_client=get_shared_model_client(hedge=True, max_tokens=512), 
         system_message="""You are a research synthesizer. 
         Combine the insights from multiple research perspectives into a comprehensive report.
         Clearly identify the technical, market, and social aspects in your synthesis."""
     )
     
-    # Build the graph with parallel execution
-    builder = DiGraphBuilder()
-    
-    # Add all nodes
-    builder.add_node(tech_researcher)
-    builder.add_node(market_researcher)
-    builder.add_node(social_researcher)
-    builder.add_node(synthesizer)
+    task = "Research the impact of artificial intelligence on healthcare."
     
-    # Fan out to all researchers (parallel execution)
-    # In this case, all researchers are source nodes
+    # Fan out: the researchers are independent, so run them concurrently.
+    # Wall time for this phase is the slowest researcher, not the sum of all three.
+    researchers = [tech_researcher, market_researcher, social_researcher]
+    results = await asyncio.gather(*(researcher.run(task=task) for researcher in researchers))
     
-    # Fan in from all researchers to synthesizer
-    builder.add_edge(tech_researcher, synthesizer)
-    builder.add_edge(market_researcher, synthesizer)
-    builder.add_edge(social_researcher, synthesizer)
+    findings = []
+    for researcher, result in zip(researchers, results):
+        finding = result.messages[-1].content
+        print(f"---------- {researcher.name} ----------\n{finding}\n")
+        findings.append(f"## {researcher.name}\n{finding}")
     
-    # Build and validate the graph
-    graph = builder.build()
-    
-    # Create the flow with a termination condition
-    flow = GraphFlow(
-        participants=[tech_researcher, market_researcher, social_researcher, synthesizer], 
-        graph=graph,
-        termination_condition=MaxMessageTermination(5)  # Terminate after 5 messages
+    # Fan in: the synthesizer starts once every researcher has reported
+    synthesis = await synthesizer.run(
+        task=f"Topic: {task}\n\nResearch findings:\n\n" + "\n\n".join(findings)
     )
+    print(f"---------- {synthesizer.name} ----------\n{synthesis.messages[-1].content}")
     
-    # Run the flow
-    async for event in flow.run_stream(task="Research the impact of artificial intelligence on healthcare."):
-        print(f"{event}")
\ No newline at end of file
+    # Clean up
+    await client.close()
+
+if __name__ == "__main__":
+    run(main())
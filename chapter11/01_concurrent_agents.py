@@ -9,12 +9,15 @@ simultaneously through topic-based messaging and result aggregation.
 
 Prerequisites:
 - AutoGen v0.5+ installed
-- Python 3.9+ with asyncio support
+- Python 3.10+ with asyncio support
 - Understanding of AutoGen Core concepts
 
 Usage:
 ```bash
 python -m chapter11.01_concurrent_agents
+
+# Skip the simulated work to time the runtime itself
+DEMO_SLEEP=0 python -m chapter11.01_concurrent_agents
 ```
 
 Expected Output:
@@ -39,10 +42,12 @@ AutoGen Version: 0.5+
 
 # Standard library imports
 import asyncio
+import os
 import sys
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 # Third-party imports
 from autogen_core import (
@@ -59,23 +64,84 @@ from autogen_core import (
 
 # Local imports
 sys.path.append(str(Path(__file__).parent.parent))
+from utils.runtime import run
+
+# Task table shared by every agent: (task_id, description)
+TASKS: Tuple[Tuple[str, str], ...] = (
+    ("task-1", "Process data concurrently"),
+    ("task-2", "Another concurrent task"),
+    ("task-3", "Third concurrent task"),
+    ("task-4", "Fourth concurrent task"),
+    ("task-5", "Fifth concurrent task"),
+)
 
 # Define message types
-@dataclass
-class Task:
-    """A task message."""
-    task_id: str
-    description: str
+@dataclass(slots=True)
+class TaskRef:
+    """A task message, referring to an entry of TASKS by index."""
+    idx: int
 
-@dataclass
+@dataclass(slots=True)
 class TaskResult:
     """A task result message."""
     task_id: str
     result: str
     processor: str
 
-# Shared results storage
-shared_results: Dict[str, List[TaskResult]] = {}
+# Scale factor for the simulated work; DEMO_SLEEP=0 skips the sleeps so that
+# only the runtime's own messaging overhead is measured
+DEMO_SLEEP = float(os.environ.get("DEMO_SLEEP", "1"))
+
+# Seconds to wait for all results before stopping anyway
+RESULTS_TIMEOUT = 60.0
+
+class ResultStore:
+    """Results collected during one run of the example."""
+    
+    def __init__(self, task_ids: Iterable[str], expected_results: int) -> None:
+        """Create an empty result list for every task up front."""
+        self.results: Dict[str, List[TaskResult]] = {task_id: [] for task_id in task_ids}
+        self.total_results = 0  # Running count of results across all tasks
+        self.expected_results = expected_results
+        self.done = asyncio.Event()  # Set when the last expected result arrives
+    
+    def add(self, result: TaskResult) -> None:
+        """Record a result and signal completion once all expected results are in."""
+        self.results[result.task_id].append(result)
+        self.total_results += 1
+        if self.total_results == self.expected_results:
+            self.done.set()
+    
+    def count_by_processor(self) -> Dict[str, int]:
+        """Count results per processor."""
+        return dict(Counter(result.processor for results in self.results.values() for result in results))
+
+# Buffered console output: handlers queue lines and a single writer task
+# flushes them, so agents never block on stdout
+log_q: "asyncio.Queue[str]" = asyncio.Queue()
+
+def log(message: str) -> None:
+    """Queue a line of output for the log writer."""
+    log_q.put_nowait(message + "\n")
+
+def flush_log(lines: Optional[List[str]] = None) -> None:
+    """Write ``lines`` plus every queued line to stdout in one call."""
+    lines = lines or []
+    while not log_q.empty():
+        lines.append(log_q.get_nowait())
+    if lines:
+        sys.stdout.write("".join(lines))
+
+async def log_drain() -> None:
+    """Write queued output, batching whatever has accumulated since the last write."""
+    while True:
+        flush_log([await log_q.get()])
+
+# Processor agents to register
+PROCESSOR_NAMES = ("Processor 1", "Processor 2", "Processor 3")
+
+# Simulated processing time (seconds) for each processor, by registration order
+PROCESSING_TIMES = (1.0, 1.5, 2.0)
 
 # Define the results topic
 RESULTS_TOPIC_TYPE = "results"
@@ -86,54 +152,64 @@ results_topic_id = TopicId(type=RESULTS_TOPIC_TYPE, source="default")
 class ProcessorAgent(RoutedAgent):
     """An agent that processes tasks."""
     
-    def __init__(self, description: str) -> None:
+    def __init__(self, description: str, index: int) -> None:
         """Initialize the processor agent."""
+        # Interned, since every TaskResult carries this name and the summary counts by it
+        description = sys.intern(description)
         super().__init__(description)
+        # Simulated processing time, with different durations per processor
+        self._processing_time = PROCESSING_TIMES[index % len(PROCESSING_TIMES)]
+        # Time actually spent per task once DEMO_SLEEP scales (or skips) the sleep
+        effective_time = self._processing_time * DEMO_SLEEP
+        # Output whose agent-specific part never changes, formatted once
+        self._start_fmt = f"{description} starting task {{}}: {{}}"
+        self._finish_fmt = f"{description} finished task {{}} in {effective_time:.1f}s"
+        self._result_text = f"Processed by {description} in {effective_time:.1f}s"
     
     @message_handler
-    async def handle_task(self, message: Task, ctx: MessageContext) -> None:
+    async def handle_task(self, message: TaskRef, ctx: MessageContext) -> None:
         """Process a task."""
-        print(f"{self._description} starting task {message.task_id}: {message.description}")
+        task_id, description = TASKS[message.idx]
+        log(self._start_fmt.format(task_id, description))
         
-        # Simulate processing time with different durations based on agent name
-        processing_time = 1.0 + (hash(self._description) % 3) / 2.0
-        await asyncio.sleep(processing_time)
+        # Simulate processing time
+        processing_time = self._processing_time
+        if DEMO_SLEEP:
+            await asyncio.sleep(processing_time * DEMO_SLEEP)
         
         # Generate a result
         result = TaskResult(
-            task_id=message.task_id,
-            result=f"Processed by {self._description} in {processing_time:.1f}s",
+            task_id=task_id,
+            result=self._result_text,
             processor=self._description
         )
         
-        # Publish the result to the results topic
+        # Publish the result to the results topic. The runtime's message queue is
+        # unbounded, so this enqueues the envelope without suspending the handler;
+        # there is no slow path here for a put_nowait shortcut to avoid.
         await self.publish_message(result, topic_id=results_topic_id)
         
-        print(f"{self._description} finished task {message.task_id} in {processing_time:.1f}s")
+        log(self._finish_fmt.format(task_id))
 
 @type_subscription(topic_type=RESULTS_TOPIC_TYPE)
 class ResultCollectorAgent(RoutedAgent):
     """An agent that collects task results."""
     
-    def __init__(self, description: str) -> None:
+    def __init__(self, description: str, store: ResultStore) -> None:
         """Initialize the result collector agent."""
         super().__init__(description)
+        self._store = store
     
     @message_handler
     async def handle_result(self, message: TaskResult, ctx: MessageContext) -> None:
         """Collect a task result."""
-        print(f"Collector received result for task {message.task_id} from {message.processor}")
-        
-        # Initialize the list for this task if it doesn't exist
-        if message.task_id not in shared_results:
-            shared_results[message.task_id] = []
+        log(f"Collector received result for task {message.task_id} from {message.processor}")
         
-        # Add the result to the list
-        shared_results[message.task_id].append(message)
+        # Add the result to the list for this task
+        store = self._store
+        store.add(message)
         
-        # Count total results across all tasks
-        total_results = sum(len(results) for results in shared_results.values())
-        print(f"Current results: {len(shared_results)} unique tasks, {total_results} total results")
+        log(f"Current results: {len(store.results)} unique tasks, {store.total_results} total results")
 
 async def main() -> None:
     """Main function to demonstrate concurrent agents execution patterns."""
@@ -142,61 +218,61 @@ async def main() -> None:
     # Create a runtime
     runtime = SingleThreadedAgentRuntime()
     
-    # Register processor agents
-    await ProcessorAgent.register(
-        runtime, 
-        "processor_1", 
-        lambda: ProcessorAgent("Processor 1")
-    )
-    await ProcessorAgent.register(
-        runtime, 
-        "processor_2", 
-        lambda: ProcessorAgent("Processor 2")
-    )
-    await ProcessorAgent.register(
-        runtime, 
-        "processor_3", 
-        lambda: ProcessorAgent("Processor 3")
-    )
+    # Results of this run; every processor handles every task
+    store = ResultStore((task_id for task_id, _ in TASKS), len(PROCESSOR_NAMES) * len(TASKS))
     
-    # Register the result collector
-    await ResultCollectorAgent.register(
-        runtime, 
-        "collector", 
-        lambda: ResultCollectorAgent("Result Collector")
+    # Register the processor agents and the result collector together
+    await asyncio.gather(
+        *(
+            ProcessorAgent.register(
+                runtime, 
+                f"processor_{index + 1}", 
+                lambda name=name, index=index: ProcessorAgent(name, index)
+            )
+            for index, name in enumerate(PROCESSOR_NAMES)
+        ),
+        ResultCollectorAgent.register(
+            runtime, 
+            "collector", 
+            lambda: ResultCollectorAgent("Result Collector", store)
+        ),
     )
     
-    # Start the runtime
+    # Start the runtime and the log writer
     runtime.start()
+    log_writer = asyncio.create_task(log_drain())
     
-    # Create tasks
-    tasks = [
-        Task(task_id="task-1", description="Process data concurrently"),
-        Task(task_id="task-2", description="Another concurrent task"),
-        Task(task_id="task-3", description="Third concurrent task"),
-        Task(task_id="task-4", description="Fourth concurrent task"),
-        Task(task_id="task-5", description="Fifth concurrent task")
-    ]
+    # Create task messages, one index per entry of the task table
+    tasks = [TaskRef(idx) for idx in range(len(TASKS))]
     
     # Define the tasks topic
     tasks_topic = TopicId(type="tasks", source="default")
     
     # Publish tasks to the tasks topic (all processors will receive them)
-    print("Publishing tasks to all processors...")
-    for task in tasks:
-        print(f"Publishing task {task.task_id}")
-        await runtime.publish_message(task, topic_id=tasks_topic)
+    log("Publishing tasks to all processors...")
+    for task_id, _ in TASKS:
+        log(f"Publishing task {task_id}")
+    await asyncio.gather(*(runtime.publish_message(task, topic_id=tasks_topic) for task in tasks))
     
     # Wait for all processing to complete
-    print("\nWaiting for tasks to complete...")
-    await runtime.stop_when_idle()
+    log("\nWaiting for tasks to complete...")
+    try:
+        await asyncio.wait_for(store.done.wait(), timeout=RESULTS_TIMEOUT)
+    except asyncio.TimeoutError:
+        log(f"Timed out with {store.total_results}/{store.expected_results} results")
+    await runtime.stop()
+    
+    # Stop the log writer and write out anything still queued
+    log_writer.cancel()
+    flush_log()
     
     # Print final results
     print(f"\n=== Final Results ===")
-    print(f"Tasks processed: {len(shared_results)} unique tasks")
-    print(f"Total results: {sum(len(results) for results in shared_results.values())}")
+    print(f"Tasks processed: {len(store.results)} unique tasks")
+    print(f"Total results: {store.total_results}")
     
-    for task_id, results in sorted(shared_results.items()):
+    # Result lists were created in task order, so no sorting is needed
+    for task_id, results in store.results.items():
         print(f"\n{task_id}:")
         for result in results:
             print(f"  - {result.result}")
@@ -204,21 +280,16 @@ async def main() -> None:
     # Show task distribution (each task is processed by all processors)
     print("\n=== Task Distribution ===")
     print("Since all processors subscribe to the same topic, each task is processed by all processors:")
-    processor_counts = {}
-    for task_id, results in shared_results.items():
-        for result in results:
-            if result.processor not in processor_counts:
-                processor_counts[result.processor] = 0
-            processor_counts[result.processor] += 1
+    processor_counts = store.count_by_processor()
     
-    for processor, count in sorted(processor_counts.items()):
-        print(f"{processor}: {count} tasks")
+    for processor in PROCESSOR_NAMES:
+        print(f"{processor}: {processor_counts.get(processor, 0)} tasks")
     
     print("\n=== Example completed ===")
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
         print("\nExample interrupted by user")
     except Exception as e:
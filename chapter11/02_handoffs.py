@@ -43,13 +43,19 @@ AutoGen Version: 0.5+
 # Standard library imports
 import asyncio
 import json
+import logging
+import re
 import sys
+import threading
 import uuid
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 # Third-party imports
 from autogen_core import (
+    CacheStore,
     FunctionCall,
     MessageContext,
     RoutedAgent,
@@ -61,36 +67,129 @@ from autogen_core import (
 from autogen_core.models import (
     AssistantMessage,
     ChatCompletionClient,
+    CreateResult,
     FunctionExecutionResult,
     FunctionExecutionResultMessage,
     LLMMessage,
+    RequestUsage,
     SystemMessage,
     UserMessage,
 )
-from autogen_core.tools import FunctionTool, Tool
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from pydantic import BaseModel
+from autogen_core.tools import FunctionTool, Tool, ToolSchema
+from autogen_ext.models.cache import CHAT_CACHE_VALUE_TYPE, ChatCompletionCache
+from pydantic import BaseModel, ConfigDict
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Local imports
 sys.path.append(str(Path(__file__).parent.parent))
-from utils.config import get_openai_config
+from utils.model_client import get_shared_model_client
+from utils.queue_logging import start_queue_logging, wait_for_console
+
+# Conversation output goes through a queue to a writer thread, so handlers never block on stdout.
+# Raise the level to logging.WARNING to silence it.
+log = logging.getLogger(__name__)
+SEPARATOR = "-" * 80
+
+def _parse_args(arguments: str) -> dict:
+    """Parse a function call's JSON arguments, using orjson when it is installed."""
+    if not arguments:
+        return {}
+    return orjson.loads(arguments) if HAS_ORJSON else json.loads(arguments)
+
+@lru_cache(maxsize=None)
+def _schema(tool: Tool) -> ToolSchema:
+    """Return a tool's JSON schema, computed once per tool.
+
+    ``Tool.schema`` rebuilds the schema from the argument model on every access, and the
+    module-level tools are shared by every agent instance (one per session and agent type).
+    """
+    return tool.schema
+
+def _result_text(result: object) -> str:
+    """Render a tool's return value for the LLM as compact text (no whitespace in JSON)."""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, BaseModel):
+        return result.model_dump_json()
+    if isinstance(result, (dict, list)):
+        return orjson.dumps(result).decode() if HAS_ORJSON else json.dumps(result, separators=(",", ":"))
+    return str(result)
+
+class LRUCacheStore(CacheStore[CHAT_CACHE_VALUE_TYPE]):
+    """In-memory response store that evicts the least recently used entry beyond ``maxsize``."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._entries: "OrderedDict[str, CHAT_CACHE_VALUE_TYPE]" = OrderedDict()
+        self._maxsize = maxsize
+
+    def get(self, key: str, default: Optional[CHAT_CACHE_VALUE_TYPE] = None) -> Optional[CHAT_CACHE_VALUE_TYPE]:
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key: str, value: CHAT_CACHE_VALUE_TYPE) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+# Held by every console reader (the user and human agents, and execute_order's confirmation), which all
+# read in worker threads; tool calls from one turn run concurrently, so their prompts take turns
+STDIN_LOCK = threading.Lock()
+
+def _input_after_output(prompt: str) -> str:
+    with STDIN_LOCK:
+        wait_for_console()  # let queued output reach the console before the prompt
+        return input(prompt)
+
+async def _ainput(prompt: str) -> str:
+    """Read a console line in a worker thread so other agents keep running while the user types."""
+    return await asyncio.to_thread(_input_after_output, prompt)
+
+SUMMARY_PROMPT = (
+    "Summarize this customer service conversation in a few sentences. Keep the customer's "
+    "requests, product names, item IDs, prices and any actions already taken."
+)
+
+def _message_text(message: LLMMessage) -> str:
+    """Render a context message as one transcript line for the summarizer."""
+    if isinstance(message, FunctionExecutionResultMessage):
+        return "\n".join(f"tool {result.name}: {result.content}" for result in message.content)
+    return f"{getattr(message, 'source', 'system')}: {message.content}"
+
+# How long the user agent keeps waiting for the rest of a burst of queued user messages
+COALESCE_WINDOW = 0.05  # seconds
 
 # ------------------------ Message Protocol Definition ------------------------
 # Define message types used for event-driven communication between agents.
+# Events are frozen: a handler never reassigns an event's fields.
 
 class UserLogin(BaseModel):
     """Event triggered when a user logs in to start a new session."""
-    pass
+    model_config = ConfigDict(frozen=True)
 
 class UserTask(BaseModel):
     """Event representing the user's current task or query (contains chat context)."""
+    model_config = ConfigDict(frozen=True)
     context: List[LLMMessage]
 
 class AgentResponse(BaseModel):
     """Event for agents' replies to the user (contains updated chat context and a topic for the user reply)."""
+    model_config = ConfigDict(frozen=True)
     reply_to_topic_type: str   # which agent topic the user should reply to next
     context: List[LLMMessage]
 
+class UserInput(BaseModel):
+    """A user message from another input source (e.g. a web front end), queued for the next turn."""
+    model_config = ConfigDict(frozen=True)
+    content: str
+
 # ------------------------ AI Agent Base Class ------------------------
 class AIAgent(RoutedAgent):
     """
@@ -98,6 +197,7 @@ class AIAgent(RoutedAgent):
     Subscribes to its own topic (agent_topic_type) and publishes responses to the user_topic_type.
     Can call regular tools for actions or delegate_tools to hand off tasks to other agents.
     """
+
     def __init__(
         self,
         description: str,
@@ -107,16 +207,89 @@ class AIAgent(RoutedAgent):
         delegate_tools: List[Tool],
         agent_topic_type: str,
         user_topic_type: str,
+        max_context_messages: int = 12,
     ):
         super().__init__(description)
-        self._system_message = system_message           # System prompt for this agent's role/persona
+        # System prompt for this agent's role/persona, followed by the agent-code legend
+        self._system_message = SystemMessage(content=f"{system_message.content}\n{TOPIC_LEGEND}")
         self._model_client = model_client               # LLM client (e.g., OpenAI API)
         self._tools = {tool.name: tool for tool in tools}  # Regular tools by name
-        self._tool_schema = [tool.schema for tool in tools]  # JSON schemas for regular tools
+        self._tool_schema = [_schema(tool) for tool in tools]  # JSON schemas for regular tools
         self._delegate_tools = {tool.name: tool for tool in delegate_tools}       # Delegate tools by name
-        self._delegate_tool_schema = [tool.schema for tool in delegate_tools]     # JSON schemas for delegate tools
+        self._delegate_tool_schema = [_schema(tool) for tool in delegate_tools]     # JSON schemas for delegate tools
+        # The system message and tool schemas form the start of every request. OpenAI caches
+        # repeated prompt prefixes automatically, so build this list once and never mutate it
+        # (or the system message) to keep the prefix byte-identical across turns. A tuple
+        # makes that immutability explicit.
+        self._all_tool_schema = tuple(self._tool_schema + self._delegate_tool_schema)
+        # Dispatch table: tool name -> (is_delegate, tool), so each call needs a single lookup
+        self._dispatch = {name: (False, tool) for name, tool in self._tools.items()} | {
+            name: (True, tool) for name, tool in self._delegate_tools.items()
+        }
+        # Tools without parameters (all the handoff tools): their arguments are never parsed
+        self._argless = {
+            name for name, (_, tool) in self._dispatch.items() if not _schema(tool).get("parameters", {}).get("properties")
+        }
         self._agent_topic_type = agent_topic_type       # Topic type this agent listens to (its own type)
         self._user_topic_type = user_topic_type         # Topic type for sending messages to the user
+        self._max_ctx_msgs = max_context_messages       # Older messages are folded into a summary
+
+    async def _compact_context(self, context: List[LLMMessage], ctx: MessageContext) -> None:
+        """
+        Replace all but the last ``_max_ctx_msgs`` messages with a short summary, in place.
+        The whole context is re-sent on every LLM call, so without this each turn costs more than the last.
+        Because the summary replaces the old messages in the context that is handed on, it is
+        computed once; later agents and turns reuse it (and fold it into the next summary).
+        """
+        cut = len(context) - self._max_ctx_msgs
+        # Never separate tool results from the function calls they answer
+        while cut > 0 and isinstance(context[cut], FunctionExecutionResultMessage):
+            cut -= 1
+        if cut <= 1:
+            return
+        transcript = "\n".join(_message_text(m) for m in context[:cut])
+        summary = await self._model_client.create(
+            messages=[SystemMessage(content=SUMMARY_PROMPT), UserMessage(content=transcript, source="User")],
+            cancellation_token=ctx.cancellation_token,
+        )
+        context[:cut] = [SystemMessage(content=f"Summary of the earlier conversation: {summary.content}")]
+        log.info("%s\n%s: Summarized %d earlier messages", SEPARATOR, self.id.type, cut)
+
+    async def _generate(self, messages: List[LLMMessage], ctx: MessageContext, label: str) -> CreateResult:
+        """
+        Stream one LLM response, printing text as it arrives, and return the final result.
+        The stream carries no partial function-call arguments, so tool calls are run from the final result.
+        """
+        log.info("%s\n%s (%s):", SEPARATOR, self.id.type, label)
+        llm_result = None
+        streamed_text = False
+        async for chunk in self._model_client.create_stream(
+            messages=messages,
+            tools=self._all_tool_schema,  # allow both regular and delegate tools
+            cancellation_token=ctx.cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                llm_result = chunk
+            else:
+                log.info("%s", chunk, extra={"end": ""})
+                streamed_text = True
+        assert llm_result is not None
+        # End the streamed line, or show the function calls, which are not streamed
+        log.info("%s", "" if streamed_text else llm_result.content)
+        return llm_result
+
+    async def _first_response(self, message: UserTask, messages: List[LLMMessage], ctx: MessageContext) -> CreateResult:
+        """Produce the first response to a task. Subclasses may answer some tasks without the LLM."""
+        return await self._generate(messages, ctx, "LLM")
+
+    async def _run_call(self, call: FunctionCall, tool: Tool, ctx: MessageContext) -> FunctionExecutionResult:
+        """Run one function call; a failure is returned as an error result so it does not cancel the other calls."""
+        try:
+            arguments = {} if call.name in self._argless else _parse_args(call.arguments)
+            result = await tool.run_json(arguments, ctx.cancellation_token)
+            return FunctionExecutionResult(call_id=call.id, content=_result_text(result), is_error=False, name=call.name)
+        except Exception as e:  # includes malformed arguments (orjson.JSONDecodeError subclasses ValueError)
+            return FunctionExecutionResult(call_id=call.id, content=f"Error: {e}", is_error=True, name=call.name)
 
     @message_handler
     async def handle_task(self, message: UserTask, ctx: MessageContext) -> None:
@@ -128,68 +301,71 @@ class AIAgent(RoutedAgent):
         If the response is a normal message, send it back to the user as AgentResponse.
         """
         # 1. Generate a response from the LLM, including possible tool calls.
-        llm_result = await self._model_client.create(
-            messages=[self._system_message] + message.context,
-            tools=self._tool_schema + self._delegate_tool_schema,  # allow both regular and delegate tools
-            cancellation_token=ctx.cancellation_token,
-        )
-        print("-" * 80 + f"\n{self.id.type} (LLM):\n{llm_result.content}", flush=True)
+        await self._compact_context(message.context, ctx)
+        # The request list is built once and then extended in step with message.context,
+        # instead of re-copying the whole history for every follow-up call.
+        messages: List[LLMMessage] = [self._system_message, *message.context]
+        llm_result = await self._first_response(message, messages, ctx)
         
         # 2. If the LLM returned function calls (could be multiple), handle them:
         while isinstance(llm_result.content, list) and all(isinstance(m, FunctionCall) for m in llm_result.content):
-            tool_call_results: List[FunctionExecutionResult] = []
-            delegate_targets: List[Tuple[str, UserTask]] = []
-
-            # Process each function call in sequence
+            # Sort the calls into regular tool calls and delegate (handoff) calls
+            calls: List[Tuple[FunctionCall, Tool, bool]] = []
             for call in llm_result.content:
-                arguments = json.loads(call.arguments) if call.arguments else {}  # parse arguments for the function call
-                if call.name in self._tools:
-                    # Regular tool call: execute the tool and collect the result.
-                    result = await self._tools[call.name].run_json(arguments, ctx.cancellation_token)
-                    result_str = self._tools[call.name].return_value_as_string(result)
-                    tool_call_results.append(
-                        FunctionExecutionResult(call_id=call.id, content=result_str, is_error=False, name=call.name)
-                    )
-                elif call.name in self._delegate_tools:
-                    # Delegate tool call: determine which agent/topic to hand off to.
-                    result = await self._delegate_tools[call.name].run_json(arguments, ctx.cancellation_token)
-                    target_topic = self._delegate_tools[call.name].return_value_as_string(result)
-                    # Prepare a new UserTask message for the target agent, including the current conversation plus this handoff.
-                    delegate_messages = list(message.context) + [
-                        AssistantMessage(content=[call], source=self.id.type),               # include the function call as an assistant message
-                        FunctionExecutionResultMessage(content=[FunctionExecutionResult(
-                            call_id=call.id,
-                            content=f"Transferred to {target_topic}. Adopt persona immediately.",
-                            is_error=False,
-                            name=call.name,
-                        )])
-                    ]
-                    delegate_targets.append((target_topic, UserTask(context=delegate_messages)))
-                else:
+                entry = self._dispatch.get(call.name)
+                if entry is None:
                     raise ValueError(f"Unknown tool called: {call.name}")
+                is_delegate, tool = entry
+                calls.append((call, tool, is_delegate))
 
-            # If any delegate handoffs were prepared, publish those tasks to the respective agent topics
+            # Run all calls concurrently, so the round takes as long as its slowest call rather than the sum
+            results = await asyncio.gather(*(self._run_call(call, tool, ctx) for call, tool, _ in calls))
+
+            tool_call_results: List[FunctionExecutionResult] = []
+            delegate_targets: List[Tuple[str, UserTask]] = []
+            for (call, _, is_delegate), result in zip(calls, results):
+                if not is_delegate or result.is_error:
+                    # Regular tool call (or a failed handoff): collect the result for the LLM.
+                    tool_call_results.append(result)
+                    continue
+                # Delegate tool call: the result names the agent/topic to hand off to.
+                target_topic = result.content
+                # Prepare a new UserTask message for the target agent, including the current conversation plus this handoff.
+                delegate_messages = list(message.context) + [
+                    AssistantMessage(content=[call], source=self.id.type),               # include the function call as an assistant message
+                    FunctionExecutionResultMessage(content=[FunctionExecutionResult(
+                        call_id=call.id,
+                        content=f"Transferred to {TOPIC_SHORT[target_topic]}. Adopt persona.",
+                        is_error=False,
+                        name=call.name,
+                    )])
+                ]
+                delegate_targets.append((target_topic, UserTask(context=delegate_messages)))
+
+            # If any delegate handoffs were prepared, publish those tasks to the respective agent topics.
+            # publish_message only puts the message on the runtime's own unbounded queue (subscriptions
+            # are resolved when it is delivered), so it never waits and an extra batching queue in
+            # front of it would add a hop without saving any work.
             if delegate_targets:
-                for topic_type, task in delegate_targets:
-                    print("-" * 80 + f"\n{self.id.type}: Delegating to {topic_type}", flush=True)
+                async def delegate(topic_type: str, task: UserTask) -> None:
+                    log.info("%s\n%s: Delegating to %s", SEPARATOR, self.id.type, topic_type)
                     await self.publish_message(task, topic_id=TopicId(topic_type, source=self.id.key))
+
+                await asyncio.gather(*(delegate(topic_type, task) for topic_type, task in delegate_targets))
                 # Once handed off, this agent's work on the task is done.
                 return
 
             # If we had regular tool results (no delegate), feed those results back into the LLM for a follow-up response.
             if tool_call_results:
-                print("-" * 80 + f"\n{self.id.type} (Tool Results):\n{tool_call_results}", flush=True)
+                log.info("%s\n%s (Tool Results):\n%s", SEPARATOR, self.id.type, tool_call_results)
                 # Extend the context with the tool call and its result before asking the LLM to continue.
-                message.context.extend([
+                new_messages = [
                     AssistantMessage(content=llm_result.content, source=self.id.type),
                     FunctionExecutionResultMessage(content=tool_call_results),
-                ])
-                llm_result = await self._model_client.create(
-                    messages=[self._system_message] + message.context,
-                    tools=self._tool_schema + self._delegate_tool_schema,
-                    cancellation_token=ctx.cancellation_token,
-                )
-                print("-" * 80 + f"\n{self.id.type} (LLM follow-up):\n{llm_result.content}", flush=True)
+                ]
+                message.context.extend(new_messages)
+                messages.extend(new_messages)
+                llm_result = await self._generate(messages, ctx, "LLM follow-up")
             # Loop will continue if the new llm_result is again a list of FunctionCalls.
         # 3. If we exit the loop, the LLM result is a final answer (string). Send it back to the user.
         assert isinstance(llm_result.content, str)
@@ -202,12 +378,43 @@ class AIAgent(RoutedAgent):
         )
         # (The reply_to_topic_type tells the user agent which agent topic to send the next UserTask to.)
 
+# ------------------------ Triage Agent ------------------------
+# Keyword routes for the triage fast path: pattern -> handoff tool to call
+TRIAGE_ROUTES = [
+    (re.compile(r"\b(refunds?|return(ed|ing)?|broken|defective|damaged|repairs?)\b", re.IGNORECASE), "transfer_to_refund_agent"),
+    (re.compile(r"\b(buy(ing)?|purchas(e|ing)|orders?|price)\b", re.IGNORECASE), "transfer_to_sales_agent"),
+    (re.compile(r"\b(human|person|representative|operator)\b", re.IGNORECASE), "escalate_to_human"),
+]
+
+class TriageAgent(AIAgent):
+    """
+    AI agent for the triage role. Most opening requests name what they are about ("I want a refund"),
+    so when exactly one keyword route matches the latest user message, the handoff is made directly
+    without an LLM call. Messages that match no route, or several, are classified by the LLM as usual.
+    """
+
+    async def _first_response(self, message: UserTask, messages: List[LLMMessage], ctx: MessageContext) -> CreateResult:
+        last = message.context[-1] if message.context else None
+        if isinstance(last, UserMessage) and isinstance(last.content, str):
+            tools = {tool for pattern, tool in TRIAGE_ROUTES if pattern.search(last.content)}
+            if len(tools) == 1 and (tool := tools.pop()) in self._dispatch:
+                log.info("%s\n%s (keyword route): %s", SEPARATOR, self.id.type, tool)
+                call = FunctionCall(id=f"call_{uuid.uuid4().hex[:24]}", name=tool, arguments="{}")
+                return CreateResult(
+                    finish_reason="function_calls",
+                    content=[call],
+                    usage=RequestUsage(prompt_tokens=0, completion_tokens=0),
+                    cached=False,
+                )
+        return await super()._first_response(message, messages, ctx)
+
 # ------------------------ Human Agent ------------------------
 class HumanAgent(RoutedAgent):
     """
     Proxy for a human support agent. If an AI agent cannot handle the query, it hands off here.
     The HumanAgent subscribes to its own topic and will prompt a real human (via console input) for a response.
     """
+
     def __init__(self, description: str, agent_topic_type: str, user_topic_type: str):
         super().__init__(description)
         self._agent_topic_type = agent_topic_type
@@ -219,8 +426,8 @@ class HumanAgent(RoutedAgent):
         Handle a task handed off to the human agent by prompting the user (human operator) for input.
         """
         # In a real app, this could notify a human via UI. Here we use console input for the demo.
-        human_reply = input("👤 [Human agent input]: ")
-        print("-" * 80 + f"\n{self.id.type} (Human reply):\n{human_reply}", flush=True)
+        human_reply = await _ainput("👤 [Human agent input]: ")
+        log.info("%s\n%s (Human reply):\n%s", SEPARATOR, self.id.type, human_reply)
         # Append the human's reply to the conversation context:
         message.context.append(AssistantMessage(content=human_reply, source=self.id.type))
         # Send the human's answer back to the user as an AgentResponse, directing future replies back to the originating AI agent.
@@ -235,18 +442,41 @@ class UserAgent(RoutedAgent):
     Represents the end-user interface. It listens for AgentResponse events (from any agent) and prompts the user for input.
     It also initiates the session on UserLogin by asking the user’s first question.
     """
-    def __init__(self, description: str, user_topic_type: str, agent_topic_type: str):
+
+    def __init__(self, description: str, user_topic_type: str, agent_topic_type: str, coalesce: bool = True):
         super().__init__(description)
         self._user_topic_type = user_topic_type       # The topic type for user messages (usually "User")
         self._agent_topic_type = agent_topic_type     # The initial agent topic to send user queries to (e.g., triage agent)
+        self._coalesce = coalesce                     # Merge messages that arrive together into one UserTask
+        self._pending: "asyncio.Queue[str]" = asyncio.Queue()  # User messages waiting for the next turn
+
+    @message_handler
+    async def handle_user_input(self, message: UserInput, ctx: MessageContext) -> None:
+        """Queues a user message from another input source; it is sent with the next turn."""
+        self._pending.put_nowait(message.content)
+
+    async def _drain_pending(self) -> List[str]:
+        """
+        Take the next pending message plus any already queued behind it. Only when such a burst is
+        in progress does it wait up to COALESCE_WINDOW for more, so a lone console line is not delayed.
+        """
+        inputs = [await self._pending.get()]
+        while self._coalesce and not self._pending.empty():
+            while not self._pending.empty():
+                inputs.append(self._pending.get_nowait())
+            try:
+                inputs.append(await asyncio.wait_for(self._pending.get(), timeout=COALESCE_WINDOW))
+            except asyncio.TimeoutError:
+                break
+        return inputs
 
     @message_handler
     async def handle_user_login(self, message: UserLogin, ctx: MessageContext) -> None:
         """Handles a new user session start by prompting for the first user input."""
-        print("-" * 80 + f"\n[Session started] User session ID: {self.id.key}", flush=True)
+        log.info("%s\n[Session started] User session ID: %s", SEPARATOR, self.id.key)
         # Prompt the user for their initial query upon login:
-        user_input = input("🗣️ User: ")
-        print("-" * 80 + f"\n{self.id.type} (UserAgent received):\n{user_input}")
+        user_input = await _ainput("🗣️ User: ")
+        log.info("%s\n%s (UserAgent received):\n%s", SEPARATOR, self.id.type, user_input)
         # Publish the user's query as a UserTask to the triage agent (or initial agent).
         await self.publish_message(
             UserTask(context=[UserMessage(content=user_input, source="User")]),
@@ -259,11 +489,19 @@ class UserAgent(RoutedAgent):
         Receives an agent's response and prompts the user for the next input, then hands it off to the appropriate agent.
         """
         # Display the agent's response to the user and prompt for next input:
-        next_input = input("🗣️ User (type 'exit' to quit): ")
-        print("-" * 80 + f"\n{self.id.type} (UserAgent received):\n{next_input}", flush=True)
-        if next_input.strip().lower() == "exit":
-            print("-" * 80 + f"\n[Session ended] Session ID: {self.id.key}", flush=True)
+        self._pending.put_nowait(await _ainput("🗣️ User (type 'exit' to quit): "))
+        inputs = await self._drain_pending()
+        if any(text.strip().lower() == "exit" for text in inputs):
+            log.info("%s\n[Session ended] Session ID: %s", SEPARATOR, self.id.key)
             return  # End the session loop.
+        # Several messages that arrived together are sent as one turn (one LLM session instead of N)
+        if len(inputs) == 1:
+            next_input = inputs[0]
+        else:
+            next_input = "\n".join(
+                f"--- Message {i} of {len(inputs)} ---\n{text}" for i, text in enumerate(inputs, 1)
+            )
+        log.info("%s\n%s (UserAgent received):\n%s", SEPARATOR, self.id.type, next_input)
         # Append the new user message to context and route it to the agent that should handle the reply (based on reply_to_topic_type).
         message.context.append(UserMessage(content=next_input, source="User"))
         await self.publish_message(
@@ -275,31 +513,27 @@ class UserAgent(RoutedAgent):
 # Regular tools (functions) that agents can use to fulfill tasks without delegating.
 def execute_order(product: str, price: int) -> str:
     """Process an order for a product at a given price (simulated with confirmation prompt)."""
-    print("\n=== Order Summary ===")
-    print(f"Product: {product}")
-    print(f"Price: ${price}")
-    print("=====================\n")
-    confirm = input("✅ Confirm order? (y/n): ").strip().lower()
+    with STDIN_LOCK:  # keep each summary next to its own prompt when several orders are confirmed at once
+        log.info("\n=== Order Summary ===\nProduct: %s\nPrice: $%s\n=====================\n", product, price)
+        wait_for_console()  # show the summary before the prompt (tools run in a worker thread)
+        confirm = input("✅ Confirm order? (y/n): ").strip().lower()
     if confirm == "y":
-        print("Order execution successful!")
+        log.info("Order execution successful!")
         return "Success"
     else:
-        print("Order cancelled.")
+        log.info("Order cancelled.")
         return "User cancelled order."
 
 def look_up_item(search_query: str) -> str:
     """Lookup an item ID based on a search query (simulated)."""
     item_id = "item_132612938"
-    print(f"🔍 Found item ID: {item_id}")
+    log.info("🔍 Found item ID: %s", item_id)
     return item_id
 
 def execute_refund(item_id: str, reason: str = "not provided") -> str:
     """Process a refund for a given item ID (simulated)."""
-    print("\n=== Refund Summary ===")
-    print(f"Item ID: {item_id}")
-    print(f"Reason: {reason}")
-    print("======================\n")
-    print("Refund execution successful!")
+    log.info("\n=== Refund Summary ===\nItem ID: %s\nReason: %s\n======================\n", item_id, reason)
+    log.info("Refund execution successful!")
     return "success"
 
 # Wrap these functions as FunctionTool objects so agents can call them.
@@ -318,6 +552,17 @@ sales_agent_topic_type = "SalesAgent"         # handles sales requests
 human_agent_topic_type = "HumanAgent"         # handles escalations to human
 user_topic_type = "User"                     # topic type for the user (customer interface)
 
+# Short codes for the agent topics. Every handoff note stays in the context and is re-sent
+# on each later LLM call, so handoffs name the target agent by its code; the legend is
+# added once to each AI agent's system message.
+TOPIC_SHORT = {
+    triage_agent_topic_type: "T",
+    sales_agent_topic_type: "S",
+    refund_agent_topic_type: "R",
+    human_agent_topic_type: "H",
+}
+TOPIC_LEGEND = "Agent codes: " + ", ".join(f"{code}={topic}" for topic, code in TOPIC_SHORT.items()) + "."
+
 def transfer_to_sales_agent() -> str:
     """Handoff tool: signal that the SalesAgent should handle the next part of the conversation."""
     return sales_agent_topic_type
@@ -345,17 +590,22 @@ async def main():
     """Main function to demonstrate agent handoff patterns and workflows."""
     runtime = SingleThreadedAgentRuntime()
 
-    # Initialize the model client using configuration
-    config = get_openai_config()
-    model_client = OpenAIChatCompletionClient(**config)
+    # Initialize the model clients. Both run on the shared pooled HTTP client, so every agent's
+    # requests reuse the same keep-alive (HTTP/2 when available) connections.
+    model_client = get_shared_model_client()
+    # Routing is a deterministic decision, so triage runs at temperature 0 and its responses are
+    # memoized: a repeated request (e.g. "I want a refund") is routed without an API call. The
+    # cache key is a SHA-256 of the messages and tool schemas. The other agents keep the default
+    # temperature, where replaying a stored answer would change their behaviour, so they are not cached.
+    routing_client = ChatCompletionCache(get_shared_model_client(temperature=0), LRUCacheStore())
 
     # Register and configure each agent in the runtime:
 
     # 1. Triage Agent – first contact point that decides where to route queries.
-    triage_agent_type = await AIAgent.register(
+    triage_agent_type = await TriageAgent.register(
         runtime,
         type=triage_agent_topic_type,  # Using topic type string as agent type identifier.
-        factory=lambda: AIAgent(
+        factory=lambda: TriageAgent(
             description="Triage Agent: directs user requests to the appropriate department.",
             system_message=SystemMessage(content=(
                 "You are a customer service triage bot for ACME Inc. "
@@ -363,7 +613,7 @@ async def main():
                 "Decide whether their request is about a refund/issue or a new product purchase, or needs human help. "
                 "Use the appropriate handoff tool: 'transfer_to_refund_agent', 'transfer_to_sales_agent', or 'escalate_to_human'."
             )),
-            model_client=model_client,
+            model_client=routing_client,
             tools=[],  # Triage agent doesn't perform actions itself, only delegates.
             delegate_tools=[transfer_to_refund_agent_tool, transfer_to_sales_agent_tool, escalate_to_human_tool],
             agent_topic_type=triage_agent_topic_type,
@@ -453,11 +703,16 @@ async def main():
 
     # Wait for the conversation to complete (the runtime becomes idle when the user exits or all tasks done).
     await runtime.stop_when_idle()
-    await model_client.close()  # Cleanly shut down the model client
+    await model_client.close()  # Cleanly shut down the model clients and their shared connection pool
+    await routing_client.close()
 
 if __name__ == "__main__":
+    listener = start_queue_logging(log)
     try:
-        asyncio.run(main())
+        try:
+            asyncio.run(main())
+        finally:
+            listener.stop()  # write out any queued output
     except KeyboardInterrupt:
         print("\nHandoff system interrupted by user")
     except Exception as e:
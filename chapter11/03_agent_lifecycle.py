@@ -9,7 +9,7 @@ message handling, health monitoring, and cleanup procedures.
 
 Prerequisites:
 - AutoGen v0.5+ installed
-- Python 3.9+ with asyncio support
+- Python 3.10+ with asyncio support
 - Understanding of AutoGen Core concepts
 
 Usage:
@@ -41,11 +41,13 @@ AutoGen Version: 0.5+
 
 # Standard library imports
 import asyncio
+import contextlib
+import logging
 import sys
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 # Third-party imports
 from autogen_core import (
@@ -60,24 +62,30 @@ from autogen_core import (
 
 # Local imports
 sys.path.append(str(Path(__file__).parent.parent))
+from utils.queue_logging import start_queue_logging
+from utils.runtime import run
+
+# Demo output goes through a queue to a writer thread, so handlers never block on stdout.
+# Raise the level to logging.WARNING to silence it.
+log = logging.getLogger(__name__)
 
 # Define message types
-@dataclass
+@dataclass(slots=True)
 class InitializeMessage:
     """Message to initialize an agent with configuration."""
     config: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True)
 class HeartbeatMessage:
     """Periodic heartbeat message to check agent health."""
     timestamp: float = field(default_factory=time.time)
 
-@dataclass
+@dataclass(slots=True)
 class StatusRequestMessage:
     """Message to request agent status."""
     request_id: str
 
-@dataclass
+@dataclass(slots=True)
 class StatusResponseMessage:
     """Message with agent status information."""
     request_id: str
@@ -87,163 +95,309 @@ class StatusResponseMessage:
     message_count: int
     last_activity: float
 
-@dataclass
+@dataclass(slots=True)
+class AgentStatus:
+    """The monitor's latest record of one agent (updated in place)."""
+    status: str
+    uptime: float
+    message_count: int
+    last_activity: float
+
+@dataclass(slots=True)
 class ShutdownMessage:
     """Message to request agent shutdown."""
     reason: str
 
-@dataclass
+@dataclass(slots=True)
 class CheckAgentsMessage:
     """Message to trigger the monitor to check all agents."""
-    pass
+    request_id: str
+
+# Heartbeats are answered with one combined status report per agent: the report is sent
+# HEARTBEAT_FLUSH_INTERVAL after the first unreported heartbeat, or as soon as
+# HEARTBEAT_BATCH heartbeats are waiting
+HEARTBEAT_FLUSH_INTERVAL = 0.05  # seconds
+HEARTBEAT_BATCH = 16
+
+# Longest time to wait for the replies to one request
+REPLY_TIMEOUT = 1.0  # seconds
+
+# The cleanup steps below are stubs; in demo mode each one simulates its work with a short sleep
+DEMO_MODE = True
+SIMULATED_CLEANUP_TIME = 0.5  # seconds
+
+class ReplyTracker:
+    """Counts replies per request id, so the driver waits for them instead of sleeping."""
+
+    def __init__(self) -> None:
+        # request id -> (expected replies, event set once they have all arrived, replies so far)
+        self._pending: Dict[str, Tuple[int, asyncio.Event, List[Any]]] = {}
+
+    def expect(self, request_id: str, count: int) -> None:
+        """Register a request that should receive ``count`` replies. Call before publishing it."""
+        self._pending[request_id] = (count, asyncio.Event(), [])
+
+    def record(self, request_id: str, reply: Any = None) -> None:
+        """Record one reply to a request; replies to unregistered requests are ignored."""
+        entry = self._pending.get(request_id)
+        if entry is None:
+            return
+        count, event, replies = entry
+        replies.append(reply)
+        if len(replies) >= count:
+            event.set()
+
+    async def wait_for(self, request_id: str, timeout: float = REPLY_TIMEOUT) -> List[Any]:
+        """Wait until every expected reply has arrived (at most ``timeout`` seconds) and return them."""
+        _, event, replies = self._pending[request_id]
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("Timed out waiting for replies to %s", request_id)
+        del self._pending[request_id]
+        return replies
 
 class LifecycleAgent(RoutedAgent):
     """An agent that demonstrates the complete lifecycle."""
     
-    def __init__(self, description: str) -> None:
+    def __init__(self, description: str, tracker: ReplyTracker) -> None:
         """Initialize the agent."""
         super().__init__(description)
+        self.tracker = tracker
+        # The agent's key never changes, so its status topic is built once
+        self.status_topic = TopicId(type="agent.status", source=self.id.key)
         self.initialized = False
         self.start_time = time.time()
         self.message_count = 0
         self.last_activity = self.start_time
         self.config = {}
+        # Heartbeats received since the last status report, and the event that wakes the reporter
+        self.unreported_heartbeats = 0
+        self.flush_event = asyncio.Event()
+        # Handlers doing real work, and the event that is set while there are none. Status reports
+        # are held back while the agent is busy; heartbeats meanwhile join the report that follows.
+        self.busy_handlers = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.heartbeat_reporter = asyncio.create_task(self.report_heartbeats())
         
-        print(f"Agent {self.id.type} created with ID {self.id}")
+        log.info("Agent %s created with ID %s", self.id.type, self.id)
+    
+    @contextlib.contextmanager
+    def busy(self) -> Iterator[None]:
+        """Mark the agent busy for the duration of a handler's work."""
+        self.busy_handlers += 1
+        self.idle.clear()
+        try:
+            yield
+        finally:
+            self.busy_handlers -= 1
+            if self.busy_handlers == 0:
+                self.idle.set()
     
     @message_handler
     async def handle_initialize(self, message: InitializeMessage, ctx: MessageContext) -> None:
         """Handle initialization message."""
-        print(f"Agent {self.id.type} initializing with config: {message.config}")
-        self.config = message.config
-        self.initialized = True
-        self.message_count += 1
-        self.last_activity = time.time()
+        with self.busy():
+            log.info("Agent %s initializing with config: %s", self.id.type, message.config)
+            self.config = message.config
+            self.initialized = True
+            self.message_count += 1
+            self.last_activity = time.time()
+            self.tracker.record("initialize", self.id.type)
     
     @message_handler
     async def handle_heartbeat(self, message: HeartbeatMessage, ctx: MessageContext) -> None:
         """Handle heartbeat message."""
-        print(f"Agent {self.id.type} received heartbeat at {message.timestamp}")
+        log.info("Agent %s received heartbeat at %s", self.id.type, message.timestamp)
         self.message_count += 1
         self.last_activity = time.time()
         
-        # Respond with current status
-        status_topic = TopicId(type="agent.status", source=self.id.key)
-        await self.publish_message(
-            StatusResponseMessage(
-                request_id="heartbeat",
-                agent_id=self.id.type,
-                status="active" if self.initialized else "initializing",
-                uptime=time.time() - self.start_time,
-                message_count=self.message_count,
-                last_activity=self.last_activity
-            ),
-            topic_id=status_topic
-        )
+        # The status reply is sent by the heartbeat reporter, combined with other recent heartbeats.
+        # Wake it for the first heartbeat of a report (it then waits for more) and for a full batch.
+        self.unreported_heartbeats += 1
+        if self.unreported_heartbeats == 1 or self.unreported_heartbeats >= HEARTBEAT_BATCH:
+            self.flush_event.set()
+    
+    async def report_heartbeats(self) -> None:
+        """Publish one status report for all heartbeats received since the previous report."""
+        while True:
+            await self.flush_event.wait()
+            self.flush_event.clear()
+            if self.unreported_heartbeats < HEARTBEAT_BATCH:
+                # Give further heartbeats a moment to join this report
+                try:
+                    await asyncio.wait_for(self.flush_event.wait(), HEARTBEAT_FLUSH_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self.flush_event.clear()
+            # Hold the report until the agent is idle
+            await self.idle.wait()
+            self.unreported_heartbeats = 0
+            
+            # Respond with current status
+            await self.publish_message(
+                StatusResponseMessage(
+                    request_id="heartbeat",
+                    agent_id=self.id.type,
+                    status="active" if self.initialized else "initializing",
+                    uptime=time.time() - self.start_time,
+                    message_count=self.message_count,
+                    last_activity=self.last_activity
+                ),
+                topic_id=self.status_topic
+            )
     
     @message_handler
     async def handle_status_request(self, message: StatusRequestMessage, ctx: MessageContext) -> None:
         """Handle status request message."""
-        print(f"Agent {self.id.type} received status request: {message.request_id}")
-        self.message_count += 1
-        self.last_activity = time.time()
-        
-        # Respond with current status
-        status_topic = TopicId(type="agent.status", source=self.id.key)
-        await self.publish_message(
-            StatusResponseMessage(
-                request_id=message.request_id,
-                agent_id=self.id.type,
-                status="active" if self.initialized else "initializing",
-                uptime=time.time() - self.start_time,
-                message_count=self.message_count,
-                last_activity=self.last_activity
-            ),
-            topic_id=status_topic
-        )
+        with self.busy():
+            log.info("Agent %s received status request: %s", self.id.type, message.request_id)
+            now = time.time()  # read the clock once for both the activity stamp and the uptime
+            self.message_count += 1
+            self.last_activity = now
+            
+            # Respond with current status
+            await self.publish_message(
+                StatusResponseMessage(
+                    request_id=message.request_id,
+                    agent_id=self.id.type,
+                    status="active" if self.initialized else "initializing",
+                    uptime=now - self.start_time,
+                    message_count=self.message_count,
+                    last_activity=self.last_activity
+                ),
+                topic_id=self.status_topic
+            )
     
     @message_handler
     async def handle_shutdown(self, message: ShutdownMessage, ctx: MessageContext) -> None:
         """Handle shutdown message."""
-        print(f"Agent {self.id.type} shutting down: {message.reason}")
-        self.message_count += 1
-        self.last_activity = time.time()
-        
-        # Perform cleanup tasks
-        await self.cleanup()
+        with self.busy():
+            log.info("Agent %s shutting down: %s", self.id.type, message.reason)
+            self.message_count += 1
+            self.last_activity = time.time()
+            
+            # Perform cleanup tasks
+            await self.cleanup()
+            self.tracker.record("shutdown", self.id.type)
     
     async def cleanup(self) -> None:
         """Perform cleanup tasks before shutdown."""
-        print(f"Agent {self.id.type} cleaning up resources")
-        # In a real implementation, this would release resources,
-        # close connections, save state, etc.
-        await asyncio.sleep(0.5)  # Simulate cleanup work
-        print(f"Agent {self.id.type} cleanup complete")
+        log.info("Agent %s cleaning up resources", self.id.type)
+        self.heartbeat_reporter.cancel()
+        # The steps are independent I/O, so they run concurrently
+        await asyncio.gather(self._close_connections(), self._flush_state(), self._save_checkpoint())
+        log.info("Agent %s cleanup complete", self.id.type)
+    
+    async def _close_connections(self) -> None:
+        """Close the agent's network connections."""
+        # In a real implementation, this would close open clients and sockets
+        if DEMO_MODE:
+            await asyncio.sleep(SIMULATED_CLEANUP_TIME)
+    
+    async def _flush_state(self) -> None:
+        """Write out any buffered state."""
+        # In a real implementation, this would flush pending writes
+        if DEMO_MODE:
+            await asyncio.sleep(SIMULATED_CLEANUP_TIME)
+    
+    async def _save_checkpoint(self) -> None:
+        """Save a checkpoint the agent can be restored from."""
+        # In a real implementation, this would persist self.config and counters
+        if DEMO_MODE:
+            await asyncio.sleep(SIMULATED_CLEANUP_TIME)
 
 class MonitorAgent(RoutedAgent):
     """An agent that monitors other agents."""
     
-    def __init__(self, description: str) -> None:
+    def __init__(self, description: str, tracker: ReplyTracker) -> None:
         """Initialize the monitor agent."""
         super().__init__(description)
-        self.agent_statuses = {}
+        self.tracker = tracker
+        self.agent_statuses: Dict[str, AgentStatus] = {}
+        # Status request topic for each monitored agent, built once
+        self.agent_topics = {
+            agent_type: TopicId(type=f"agent.{agent_type}", source=self.id.key)
+            for agent_type in ["agent_1", "agent_2", "agent_3"]
+        }
         
-        print(f"Monitor agent {self.id.type} created with ID {self.id}")
+        log.info("Monitor agent %s created with ID %s", self.id.type, self.id)
     
     @message_handler
     async def handle_status(self, message: StatusResponseMessage, ctx: MessageContext) -> None:
         """Handle status response messages."""
-        print(f"Monitor received status from {message.agent_id}: {message.status}")
-        self.agent_statuses[message.agent_id] = {
-            "status": message.status,
-            "uptime": message.uptime,
-            "message_count": message.message_count,
-            "last_activity": message.last_activity
-        }
+        # Agent ids and statuses come from a small fixed set; interning them lets the dict lookup
+        # and the stored record reuse one string (and its cached hash) per value
+        agent_id = sys.intern(message.agent_id)
+        status = sys.intern(message.status)
+        log.info("Monitor received status from %s: %s", agent_id, status)
+        record = self.agent_statuses.get(agent_id)
+        if record is None:
+            self.agent_statuses[agent_id] = AgentStatus(
+                status=status,
+                uptime=message.uptime,
+                message_count=message.message_count,
+                last_activity=message.last_activity
+            )
+        else:
+            record.status = status
+            record.uptime = message.uptime
+            record.message_count = message.message_count
+            record.last_activity = message.last_activity
+        self.tracker.record(message.request_id, agent_id)
     
     @message_handler
     async def handle_check_request(self, message: CheckAgentsMessage, ctx: MessageContext) -> None:
         """Handle a request to check all agents."""
-        await self.check_agents(ctx)
+        await self.check_agents(message.request_id, ctx)
+        # Tell the driver this check is complete
+        self.tracker.record(message.request_id)
     
-    async def check_agents(self, ctx: MessageContext) -> None:
+    async def check_agents(self, request_id: str, ctx: MessageContext) -> None:
         """Check all agents by sending status requests."""
-        print("\nMonitor checking all agents...")
+        log.info("\nMonitor checking all agents...")
         
-        # Send status requests to all agent types
-        for agent_type in ["agent_1", "agent_2", "agent_3"]:
-            agent_topic = TopicId(type=f"agent.{agent_type}", source=self.id.key)
-            await self.publish_message(
-                StatusRequestMessage(request_id=f"check_{int(time.time())}"),
-                topic_id=agent_topic
-            )
+        # Send status requests to all agent types. The payload is the same for every agent,
+        # so one message is shared and the publishes are queued together.
+        status_request_id = f"{request_id}.status"
+        self.tracker.expect(status_request_id, len(self.agent_topics))
+        status_request = StatusRequestMessage(request_id=status_request_id)
+        await asyncio.gather(
+            *(self.publish_message(status_request, topic_id=agent_topic) for agent_topic in self.agent_topics.values())
+        )
         
         # Wait for responses
-        await asyncio.sleep(1)
+        await self.tracker.wait_for(status_request_id)
         
         # Print current status of all agents
-        print("\nCurrent agent statuses:")
+        log.info("\nCurrent agent statuses:")
         for agent_id, status in self.agent_statuses.items():
-            print(f"  {agent_id}: {status['status']}, uptime: {status['uptime']:.1f}s, messages: {status['message_count']}")
-        print()
+            log.info("  %s: %s, uptime: %.1fs, messages: %s", agent_id, status.status, status.uptime, status.message_count)
+        log.info("")
 
 async def main() -> None:
     """Main function to demonstrate comprehensive agent lifecycle management."""
-    print("\n=== Agent Lifecycle Example ===\n")
+    log.info("\n=== Agent Lifecycle Example ===\n")
     
     # Create a runtime
     runtime = SingleThreadedAgentRuntime()
+    # Shared reply counter: each step below waits for its replies rather than a fixed delay
+    tracker = ReplyTracker()
     
     # Register the monitor agent type
     monitor_type = await MonitorAgent.register(
         runtime,
         type="monitor",
-        factory=lambda: MonitorAgent("System Monitor")
+        factory=lambda: MonitorAgent("System Monitor", tracker)
     )
     
-    # Add subscription for the monitor agent to receive status messages
-    await runtime.add_subscription(TypeSubscription(topic_type="agent.status", agent_type=monitor_type.type))
-    await runtime.add_subscription(TypeSubscription(topic_type="monitor.check", agent_type=monitor_type.type))
+    # Subscriptions are collected while registering and added together once all types exist
+    # The monitor receives status messages and check requests
+    subscriptions = [
+        TypeSubscription(topic_type="agent.status", agent_type=monitor_type.type),
+        TypeSubscription(topic_type="monitor.check", agent_type=monitor_type.type),
+    ]
     
     # Register lifecycle agent types
     agent_types = []
@@ -254,20 +408,25 @@ async def main() -> None:
         agent_type = await LifecycleAgent.register(
             runtime,
             type=agent_type_name,
-            factory=lambda name=agent_type_name: LifecycleAgent(f"Agent {name}")
+            factory=lambda name=agent_type_name: LifecycleAgent(f"Agent {name}", tracker)
         )
         
-        # Add subscriptions for this agent type
-        await runtime.add_subscription(TypeSubscription(topic_type=f"agent.{agent_type_name}", agent_type=agent_type.type))
-        await runtime.add_subscription(TypeSubscription(topic_type="broadcast", agent_type=agent_type.type))
-        await runtime.add_subscription(TypeSubscription(topic_type=f"topic_{i+1}", agent_type=agent_type.type))
+        # Subscriptions for this agent type
+        subscriptions += [
+            TypeSubscription(topic_type=f"agent.{agent_type_name}", agent_type=agent_type.type),
+            TypeSubscription(topic_type="broadcast", agent_type=agent_type.type),
+            TypeSubscription(topic_type=f"topic_{i+1}", agent_type=agent_type.type),
+        ]
         
         agent_types.append(agent_type)
     
+    await asyncio.gather(*(runtime.add_subscription(subscription) for subscription in subscriptions))
+    
     # Start the runtime
     runtime.start()
     
     # Initialize the agents with different configurations
+    tracker.expect("initialize", len(agent_types))
     for i, agent_type in enumerate(agent_types):
         agent_topic = TopicId(type=f"agent.{agent_type.type}", source="main")
         config = {
@@ -282,92 +441,98 @@ async def main() -> None:
         )
     
     # Wait for initialization
-    await asyncio.sleep(1)
+    await tracker.wait_for("initialize")
     
     # Send heartbeats to all agents
-    print("\nSending heartbeats to all agents...")
+    log.info("\nSending heartbeats to all agents...")
     broadcast_topic = TopicId(type="broadcast", source="main")
+    tracker.expect("heartbeat", len(agent_types))
     await runtime.publish_message(
         HeartbeatMessage(),
         topic_id=broadcast_topic
     )
     
     # Wait for heartbeat responses
-    await asyncio.sleep(1)
+    await tracker.wait_for("heartbeat")
     
     # Trigger the monitor to check agent statuses
     monitor_topic = TopicId(type="monitor.check", source="main")
+    tracker.expect("check_0", 1)
     await runtime.publish_message(
-        CheckAgentsMessage(),
+        CheckAgentsMessage(request_id="check_0"),
         topic_id=monitor_topic
     )
     
     # Wait for check to complete
-    await asyncio.sleep(1)
+    await tracker.wait_for("check_0")
     
     # Simulate some activity
     for i in range(2):
-        print(f"\nSimulating activity cycle {i+1}...")
-        
-        # Send messages to specific topics
-        for j in range(3):
-            if i % 2 == 0 or j == 0:  # Either first cycle or first agent
-                topic = TopicId(type=f"topic_{j+1}", source="main")
-                await runtime.publish_message(
-                    HeartbeatMessage(),
-                    topic_id=topic
-                )
-        
-        # Wait for processing
-        await asyncio.sleep(1)
+        log.info("\nSimulating activity cycle %s...", i+1)
         
-        # Trigger the monitor to check agent statuses
-        await runtime.publish_message(
-            CheckAgentsMessage(),
-            topic_id=monitor_topic
+        # Send messages to specific topics, then trigger the monitor to check agent statuses.
+        # The runtime delivers messages in publish order and the heartbeat handlers update their
+        # counters before publishing, so the check (queued last) already sees every heartbeat and
+        # one barrier on the check covers the whole cycle.
+        check_id = f"check_{i+1}"
+        tracker.expect(check_id, 1)
+        await asyncio.gather(
+            *(
+                runtime.publish_message(HeartbeatMessage(), topic_id=TopicId(type=f"topic_{j+1}", source="main"))
+                for j in range(3)
+                if i % 2 == 0 or j == 0  # Either first cycle or first agent
+            ),
+            runtime.publish_message(CheckAgentsMessage(request_id=check_id), topic_id=monitor_topic),
         )
         
         # Wait for check to complete
-        await asyncio.sleep(1)
+        await tracker.wait_for(check_id)
     
     # Shutdown one agent
-    print("\nShutting down Agent 2...")
+    log.info("\nShutting down Agent 2...")
     agent2_topic = TopicId(type="agent.agent_2", source="main")
+    tracker.expect("shutdown", 1)
     await runtime.publish_message(
         ShutdownMessage(reason="Maintenance"),
         topic_id=agent2_topic
     )
     
     # Wait for shutdown
-    await asyncio.sleep(1)
+    await tracker.wait_for("shutdown")
     
     # Trigger the monitor to check agent statuses
+    tracker.expect("check_final", 1)
     await runtime.publish_message(
-        CheckAgentsMessage(),
+        CheckAgentsMessage(request_id="check_final"),
         topic_id=monitor_topic
     )
     
     # Wait for check to complete
-    await asyncio.sleep(1)
+    await tracker.wait_for("check_final")
     
     # Shutdown all remaining agents
-    print("\nShutting down all remaining agents...")
+    log.info("\nShutting down all remaining agents...")
     broadcast_topic = TopicId(type="broadcast", source="main")
+    tracker.expect("shutdown", len(agent_types))
     await runtime.publish_message(
         ShutdownMessage(reason="System shutdown"),
         topic_id=broadcast_topic
     )
     
     # Wait for shutdown
-    await asyncio.sleep(1)
+    await tracker.wait_for("shutdown")
     
     # Stop the runtime when all tasks are complete
     await runtime.stop_when_idle()
-    print("\nRuntime stopped")
+    log.info("\nRuntime stopped")
 
 if __name__ == "__main__":
+    listener = start_queue_logging(log)
     try:
-        asyncio.run(main())
+        try:
+            run(main())
+        finally:
+            listener.stop()  # write out any queued output
     except KeyboardInterrupt:
         print("\nAgent lifecycle demo interrupted by user")
     except Exception as e:
@@ -10,7 +10,7 @@ together in a coordinated system with intelligent routing and fallback patterns.
 Prerequisites:
 - OpenAI API key set in .env file (optional for demo)
 - AutoGen v0.5+ installed
-- Python 3.9+ with asyncio support
+- Python 3.10+ with asyncio support
 - Understanding of AutoGen Core messaging
 
 Usage:
@@ -42,6 +42,7 @@ AutoGen Version: 0.5+
 
 # Standard library imports
 import asyncio
+import logging
 import re
 import sys
 import time
@@ -63,43 +64,67 @@ from autogen_core.models import SystemMessage, UserMessage
 
 # Local imports
 sys.path.append(str(Path(__file__).parent.parent))
+from utils.queue_logging import start_queue_logging, wait_for_console
+from utils.runtime import run
+
+# Demo output goes through a queue to a writer thread, so handlers never block on stdout.
+# Raise the level to logging.WARNING to silence it.
+log = logging.getLogger(__name__)
 
 try:
-    from autogen_ext.models.openai import OpenAIChatCompletionClient
-    from utils.config import get_openai_config
+    from autogen_core.models import ChatCompletionClient, CreateResult
+    from utils.model_client import get_shared_model_client
     HAS_OPENAI = True
 except ImportError:
     print("OpenAI not available. Using dummy LLM agent.")
     HAS_OPENAI = False
 
+# Longest time the prompt waits for a query to be answered before asking for the next one
+QUERY_TIMEOUT = 3.0  # seconds
+
+# Inputs that end the session (compared in lower case)
+EXIT_COMMANDS = frozenset({"exit", "quit", "bye"})
+
+# Held by every console reader (the main prompt and HumanAgent), so only one thread reads stdin at a time
+STDIN_LOCK = asyncio.Lock()
+
+def _input_after_output(prompt: str) -> str:
+    wait_for_console()  # let queued output reach the console before the prompt
+    return input(prompt)
+
 # Define message types
-@dataclass
+@dataclass(slots=True)
 class UserQuery:
     """A query from the user to the system."""
     content: str
+    query_id: str = ""  # Carried through every agent so the reply can be matched to the query
 
-@dataclass
+@dataclass(slots=True)
 class SystemResponse:
     """A response from the system to the user."""
     content: str
     source: str  # Which agent generated this response
+    query_id: str = ""
+    partial: bool = False  # A streamed piece of a response that is still being generated
 
-@dataclass
+@dataclass(slots=True)
 class InternalMessage:
     """An internal message between agents."""
     content: str
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class HumanFeedbackRequest:
     """A request for human feedback."""
     query: str
     context: str
+    query_id: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class HumanFeedback:
     """Feedback provided by a human."""
     content: str
+    query_id: str = ""
 
 # 1. Rule-based Agent
 class RuleBasedAgent(RoutedAgent):
@@ -109,6 +134,9 @@ class RuleBasedAgent(RoutedAgent):
     
     def __init__(self, description: str) -> None:
         super().__init__(description)
+        # Topics this agent publishes to, built once since the agent's key never changes
+        self._user_response_topic = TopicId(type="user.response", source=self.id.key)
+        self._llm_query_topic = TopicId(type="llm.query", source=self.id.key)
         # Define patterns and responses
         self.patterns = [
             (r"(?i)hello|hi|hey", "Hello! I'm the rule-based agent. I can help with greetings and basic information."),
@@ -118,32 +146,52 @@ class RuleBasedAgent(RoutedAgent):
             (r"(?i)thank you|thanks", "You're welcome!"),
             (r"(?i)help", "I can respond to basic greetings and questions. For more complex queries, I'll pass to other agents."),
         ]
-        print(f"Rule-based agent {self.id.type} initialized")
+        # Compile the rules once. The combined alternation answers "does any rule match?" in a
+        # single scan, so queries no rule handles are forwarded after one regex call. When it does
+        # match, the compiled rules are tried in order, because the first rule in the list wins
+        # (the alternation alone would pick the leftmost match in the query instead).
+        # Each rule also keeps the first characters of its alternatives: a rule can only match a
+        # query containing one of them, so rules without any are skipped without running the regex.
+        self._compiled = [
+            (
+                re.compile(pattern),
+                pattern,
+                response,
+                frozenset(alternative[0].lower() for alternative in pattern.removeprefix("(?i)").split("|")),
+            )
+            for pattern, response in self.patterns
+        ]
+        self._any_rule = re.compile(
+            "|".join(f"(?:{pattern.removeprefix('(?i)')})" for pattern, _ in self.patterns), re.IGNORECASE
+        )
+        log.info("Rule-based agent %s initialized", self.id.type)
     
     @message_handler
     async def handle_user_query(self, message: UserQuery, ctx: MessageContext) -> None:
         """Handle user queries using pattern matching."""
         query = message.content
         
-        # Try to match the query against our patterns
-        for pattern, response in self.patterns:
-            if re.search(pattern, query):
-                print(f"Rule-based agent matched pattern: {pattern}")
-                # Send response back to user
-                await self.publish_message(
-                    SystemResponse(content=response, source=self.id.type),
-                    topic_id=TopicId(type="user.response", source=self.id.key)
-                )
-                return
+        # Try to match the query against our patterns (an empty query matches none)
+        if query and self._any_rule.search(query):
+            query_chars = set(query.lower())
+            for regex, pattern, response, first_chars in self._compiled:
+                if not first_chars.isdisjoint(query_chars) and regex.search(query):
+                    log.info("Rule-based agent matched pattern: %s", pattern)
+                    # Send response back to user
+                    await self.publish_message(
+                        SystemResponse(content=response, source=self.id.type, query_id=message.query_id),
+                        topic_id=self._user_response_topic
+                    )
+                    return
         
         # If no pattern matches, forward to the LLM agent
-        print(f"Rule-based agent couldn't handle: '{query}'. Forwarding to LLM agent.")
+        log.info("Rule-based agent couldn't handle: '%s'. Forwarding to LLM agent.", query)
         await self.publish_message(
             InternalMessage(
                 content=query,
-                metadata={"source": self.id.type, "requires": "llm_processing"}
+                metadata={"source": self.id.type, "requires": "llm_processing", "query_id": message.query_id}
             ),
-            topic_id=TopicId(type="llm.query", source=self.id.key)
+            topic_id=self._llm_query_topic
         )
 
 # 2. LLM-powered Agent
@@ -152,16 +200,14 @@ class LLMAgent(RoutedAgent):
     An agent powered by a Large Language Model.
     """
     
-    def __init__(self, description: str) -> None:
+    def __init__(self, description: str, model_client: Optional["ChatCompletionClient"] = None) -> None:
         super().__init__(description)
+        # Topics this agent publishes to, built once since the agent's key never changes
+        self._user_response_topic = TopicId(type="user.response", source=self.id.key)
+        self._human_request_topic = TopicId(type="human.request", source=self.id.key)
         
-        # Initialize LLM client if available
-        self.model_client = None
-        if HAS_OPENAI:
-            # Use configuration from utils.config instead of hardcoded values
-            openai_config = get_openai_config()
-            print(f"Using model: {openai_config.get('model', 'default')}")
-            self.model_client = OpenAIChatCompletionClient(**openai_config)
+        # LLM client shared by all LLM agents (None when OpenAI is not available)
+        self.model_client = model_client
         
         # System prompt for the LLM
         self.system_prompt = """
@@ -171,60 +217,65 @@ class LLMAgent(RoutedAgent):
         If you're unsure about something, indicate that you need human input.
         """
         
-        print(f"LLM agent {self.id.type} initialized")
+        log.info("LLM agent %s initialized", self.id.type)
     
     @message_handler
     async def handle_internal_message(self, message: InternalMessage, ctx: MessageContext) -> None:
         """Handle messages forwarded from other agents."""
         query = message.content
-        print(f"LLM agent processing: '{query}'")
+        log.info("LLM agent processing: '%s'", query)
         
         # Check if we need human input for this query
         if self._needs_human_input(query):
-            print("LLM agent requesting human input")
+            log.info("LLM agent requesting human input")
             await self.publish_message(
                 HumanFeedbackRequest(
                     query=query,
-                    context="The LLM agent needs your input on this query."
+                    context="The LLM agent needs your input on this query.",
+                    query_id=message.metadata.get("query_id", ""),
                 ),
-                topic_id=TopicId(type="human.request", source=self.id.key)
+                topic_id=self._human_request_topic
             )
             return
         
         # Process with LLM
-        response = await self._get_llm_response(query)
+        response = await self._get_llm_response(query, message.metadata.get("query_id", ""))
         
         # Send response back to user
         await self.publish_message(
-            SystemResponse(content=response, source=self.id.type),
-            topic_id=TopicId(type="user.response", source=self.id.key)
+            SystemResponse(content=response, source=self.id.type, query_id=message.metadata.get("query_id", "")),
+            topic_id=self._user_response_topic
         )
     
     @message_handler
     async def handle_human_feedback(self, message: HumanFeedback, ctx: MessageContext) -> None:
         """Handle feedback received from the human agent."""
-        print(f"LLM agent received human feedback: '{message.content}'")
+        log.info("LLM agent received human feedback: '%s'", message.content)
         
         # Incorporate human feedback into response
         response = f"Based on human input: {message.content}"
         
         # Send response back to user
         await self.publish_message(
-            SystemResponse(content=response, source=f"{self.id.type} (with human input)"),
-            topic_id=TopicId(type="user.response", source=self.id.key)
+            SystemResponse(
+                content=response, source=f"{self.id.type} (with human input)", query_id=message.query_id
+            ),
+            topic_id=self._user_response_topic
         )
     
+    # Simple heuristic: queries mentioning any of these keywords need human input.
+    # One compiled alternation checks them all in a single case-insensitive scan.
+    _HUMAN_TRIGGER_RE = re.compile(
+        r"opinion|judgment|preference|ethical|moral|controversial|personal|subjective|human input",
+        re.IGNORECASE,
+    )
+
     def _needs_human_input(self, query: str) -> bool:
         """Determine if a query needs human input."""
-        # Simple heuristic: check for specific keywords
-        human_input_triggers = [
-            "opinion", "judgment", "preference", "ethical", "moral", 
-            "controversial", "personal", "subjective", "human input"
-        ]
-        return any(trigger in query.lower() for trigger in human_input_triggers)
+        return self._HUMAN_TRIGGER_RE.search(query) is not None
     
-    async def _get_llm_response(self, query: str) -> str:
-        """Get a response from the LLM."""
+    async def _get_llm_response(self, query: str, query_id: str) -> str:
+        """Get a response from the LLM, publishing the text as partial responses while it streams."""
         if self.model_client:
             try:
                 # Use the actual LLM client with proper message types
@@ -232,10 +283,20 @@ class LLMAgent(RoutedAgent):
                     SystemMessage(content=self.system_prompt, source="system"),
                     UserMessage(content=query, source="user")
                 ]
-                response = await self.model_client.create(messages=messages)
+                # Other handlers run between chunks, and the user sees the answer as it is written
+                response = None
+                async for chunk in self.model_client.create_stream(messages=messages):
+                    if isinstance(chunk, CreateResult):
+                        response = chunk
+                    else:
+                        await self.publish_message(
+                            SystemResponse(content=chunk, source=self.id.type, query_id=query_id, partial=True),
+                            topic_id=self._user_response_topic
+                        )
+                assert response is not None
                 return response.content
             except Exception as e:
-                print(f"Error calling LLM: {e}")
+                log.warning("Error calling LLM: %s", e)
                 return f"I encountered an error processing your request: {str(e)}"
         else:
             # Dummy response for when OpenAI is not available
@@ -247,27 +308,34 @@ class HumanAgent(RoutedAgent):
     An agent that represents a human in the loop, providing oversight and input.
     """
     
-    def __init__(self, description: str) -> None:
+    def __init__(self, description: str, awaiting_human: set) -> None:
         super().__init__(description)
-        print(f"Human agent {self.id.type} initialized")
+        self._llm_feedback_topic = TopicId(type="llm.feedback", source=self.id.key)
+        self._awaiting_human = awaiting_human  # query ids the driver must not time out while the human answers
+        log.info("Human agent %s initialized", self.id.type)
     
     @message_handler
     async def handle_feedback_request(self, message: HumanFeedbackRequest, ctx: MessageContext) -> None:
         """Handle requests for human feedback."""
         query = message.query
         context = message.context
+        self._awaiting_human.add(message.query_id)
         
-        print(f"\n--- Human Input Requested ---")
-        print(f"Query: {query}")
-        print(f"Context: {context}")
-        
-        # Get input from the human
-        human_input = input("Please provide your input: ")
+        # Take turns at the console with the main prompt and other feedback requests
+        async with STDIN_LOCK:
+            log.info("\n--- Human Input Requested ---")
+            log.info("Query: %s", query)
+            log.info("Context: %s", context)
+            
+            # Get input from the human in a worker thread, so other agents keep running while they type
+            loop = asyncio.get_running_loop()
+            human_input = await loop.run_in_executor(None, _input_after_output, "Please provide your input: ")
+        self._awaiting_human.discard(message.query_id)
         
         # Send the human feedback back to the requesting agent
         await self.publish_message(
-            HumanFeedback(content=human_input),
-            topic_id=TopicId(type="llm.feedback", source=self.id.key)
+            HumanFeedback(content=human_input, query_id=message.query_id),
+            topic_id=self._llm_feedback_topic
         )
 
 # 4. Coordinator Agent
@@ -276,20 +344,23 @@ class CoordinatorAgent(RoutedAgent):
     A coordinator agent that manages the flow of messages between agents and the user.
     """
     
-    def __init__(self, description: str) -> None:
+    def __init__(self, description: str, done: Dict[str, asyncio.Event]) -> None:
         super().__init__(description)
-        print(f"Coordinator agent {self.id.type} initialized")
+        self._done = done  # query id -> event the driver waits on until the query is answered
+        self._streaming: set = set()  # query ids whose response is being shown as it streams
+        self._rule_query_topic = TopicId(type="rule.query", source=self.id.key)
+        log.info("Coordinator agent %s initialized", self.id.type)
     
     @message_handler
     async def handle_user_query(self, message: UserQuery, ctx: MessageContext) -> None:
         """Handle initial user queries and route them appropriately."""
         query = message.content
-        print(f"Coordinator received user query: '{query}'")
+        log.info("Coordinator received user query: '%s'", query)
         
         # First, try the rule-based agent
         await self.publish_message(
-            UserQuery(content=query),
-            topic_id=TopicId(type="rule.query", source=self.id.key)
+            UserQuery(content=query, query_id=message.query_id),
+            topic_id=self._rule_query_topic
         )
     
     @message_handler
@@ -298,22 +369,53 @@ class CoordinatorAgent(RoutedAgent):
         response = message.content
         source = message.source
         
-        print(f"\n--- Response from {source} ---")
-        print(response)
-        print("----------------------------\n")
+        if message.partial:
+            # Show streamed text as it arrives, under a single header
+            if message.query_id not in self._streaming:
+                self._streaming.add(message.query_id)
+                log.info("\n--- Response from %s ---", source)
+            log.info("%s", response, extra={"end": ""})
+            return
+        
+        if message.query_id in self._streaming:
+            # The text has already been shown; just close the block
+            self._streaming.discard(message.query_id)
+            log.info("")
+        else:
+            log.info("\n--- Response from %s ---", source)
+            log.info("%s", response)
+        log.info("----------------------------\n")
+        
+        # Signal that this query has been answered
+        event = self._done.pop(message.query_id, None)
+        if event is not None:
+            event.set()
 
 async def main():
     """Main function to demonstrate heterogeneous agent architecture patterns."""
-    print("\n=== Mixture of Agents Example ===\n")
+    log.info("\n=== Mixture of Agents Example ===\n")
     
     # Create a runtime
     runtime = SingleThreadedAgentRuntime()
+    # Query id -> event set by the coordinator once the query has been answered
+    done: Dict[str, asyncio.Event] = {}
+    # Query ids with a human-feedback request outstanding
+    awaiting_human: set = set()
+    
+    # One LLM client for every LLM agent, so they share a connection pool
+    model_client = None
+    if HAS_OPENAI:
+        try:
+            model_client = get_shared_model_client()
+            log.info("Using model: %s", model_client.model_info.get('family', 'default'))
+        except Exception as e:
+            log.warning("OpenAI client unavailable (%s). Using dummy LLM agent.", e)
     
     # Register agents
     coordinator_type = await CoordinatorAgent.register(
         runtime,
         type="coordinator",
-        factory=lambda: CoordinatorAgent("System Coordinator")
+        factory=lambda: CoordinatorAgent("System Coordinator", done)
     )
     
     rule_agent_type = await RuleBasedAgent.register(
@@ -325,66 +427,80 @@ async def main():
     llm_agent_type = await LLMAgent.register(
         runtime,
         type="llm_agent",
-        factory=lambda: LLMAgent("LLM-powered Assistant")
+        factory=lambda: LLMAgent("LLM-powered Assistant", model_client)
     )
     
     human_agent_type = await HumanAgent.register(
         runtime,
         type="human_agent",
-        factory=lambda: HumanAgent("Human-in-the-loop")
+        factory=lambda: HumanAgent("Human-in-the-loop", awaiting_human)
     )
     
-    # Add subscriptions
-    # Coordinator subscriptions
-    await runtime.add_subscription(TypeSubscription(topic_type="user.query", agent_type=coordinator_type.type))
-    await runtime.add_subscription(TypeSubscription(topic_type="user.response", agent_type=coordinator_type.type))
-    
-    # Rule-based agent subscriptions
-    await runtime.add_subscription(TypeSubscription(topic_type="rule.query", agent_type=rule_agent_type.type))
-    
-    # LLM agent subscriptions
-    await runtime.add_subscription(TypeSubscription(topic_type="llm.query", agent_type=llm_agent_type.type))
-    await runtime.add_subscription(TypeSubscription(topic_type="llm.feedback", agent_type=llm_agent_type.type))
-    
-    # Human agent subscriptions
-    await runtime.add_subscription(TypeSubscription(topic_type="human.request", agent_type=human_agent_type.type))
+    # Add subscriptions (independent of each other, so they are added together)
+    subscriptions = [
+        # Coordinator subscriptions
+        TypeSubscription(topic_type="user.query", agent_type=coordinator_type.type),
+        TypeSubscription(topic_type="user.response", agent_type=coordinator_type.type),
+        # Rule-based agent subscriptions
+        TypeSubscription(topic_type="rule.query", agent_type=rule_agent_type.type),
+        # LLM agent subscriptions
+        TypeSubscription(topic_type="llm.query", agent_type=llm_agent_type.type),
+        TypeSubscription(topic_type="llm.feedback", agent_type=llm_agent_type.type),
+        # Human agent subscriptions
+        TypeSubscription(topic_type="human.request", agent_type=human_agent_type.type),
+    ]
+    await asyncio.gather(*(runtime.add_subscription(subscription) for subscription in subscriptions))
     
     # Start the runtime
     runtime.start()
     
     # Interactive loop for user queries
-    print("Enter your queries (type 'exit' to quit):")
+    log.info("Enter your queries (type 'exit' to quit):")
+    loop = asyncio.get_running_loop()
+    query_count = 0
     while True:
-        user_input = input("\nYou: ")
-        if user_input.lower() in ["exit", "quit", "bye"]:
+        # Read off the event loop so agents can still finish earlier queries meanwhile
+        async with STDIN_LOCK:
+            user_input = await loop.run_in_executor(None, _input_after_output, "\nYou: ")
+        if user_input.lower() in EXIT_COMMANDS:
             break
         
         if not user_input.strip():
             continue  # Skip empty inputs
         
         # Send user query to the coordinator
+        query_count += 1
+        query_id = f"q{query_count}"
+        done[query_id] = asyncio.Event()
         await runtime.publish_message(
-            UserQuery(content=user_input),
+            UserQuery(content=user_input, query_id=query_id),
             topic_id=TopicId(type="user.query", source="user")
         )
         
-        # Wait longer for processing and give visual feedback
-        print("Processing...")
-        await asyncio.sleep(3)  # Increase wait time to allow for LLM response
-    
-    # Clean up resources
-    if HAS_OPENAI:
-        llm_agent = await runtime.get_agent_by_type(llm_agent_type.type)
-        if llm_agent and hasattr(llm_agent, "model_client"):
-            await llm_agent.model_client.close()
+        # Wait until the query is answered (at most QUERY_TIMEOUT) and give visual feedback
+        log.info("Processing...")
+        try:
+            await asyncio.wait_for(done[query_id].wait(), QUERY_TIMEOUT)
+        except asyncio.TimeoutError:
+            if query_id in awaiting_human:
+                # The human is answering at the console; prompting for the next query now would compete for stdin
+                await done[query_id].wait()
+            else:
+                done.pop(query_id, None)
     
-    # Stop the runtime
+    # Stop the runtime, then close the shared LLM client once
     await runtime.stop_when_idle()
-    print("\nRuntime stopped")
+    if model_client is not None:
+        await model_client.close()
+    log.info("\nRuntime stopped")
 
 if __name__ == "__main__":
+    listener = start_queue_logging(log)
     try:
-        asyncio.run(main())
+        try:
+            run(main())
+        finally:
+            listener.stop()  # write out any queued output
     except KeyboardInterrupt:
         print("\nMixture of agents demo interrupted by user")
     except Exception as e:
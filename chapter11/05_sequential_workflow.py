@@ -42,28 +42,35 @@ AutoGen Version: 0.5+
 
 # Standard library imports
 import asyncio
-import sys
+import hashlib
+import logging
+import os
+import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
-from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 # Third-party imports
 from autogen_core import (
-    AgentId,
     MessageContext,
     RoutedAgent,
     SingleThreadedAgentRuntime,
     TopicId,
-    TypeSubscription,
     message_handler,
     type_subscription,
 )
+from autogen_core.models import SystemMessage, UserMessage
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
 from utils.config import get_openai_config
+from utils.queue_logging import start_queue_logging
+from utils.runtime import run
+
+# Demo output goes through a queue to a writer thread, so handlers never block on stdout.
+# Raise the level to logging.WARNING to silence it.
+log = logging.getLogger(__name__)
 
 # Define workflow message types
 @dataclass
@@ -92,6 +99,15 @@ RESULTS_TOPIC_TYPE = "workflow.results"
 
 # Define workflow stages
 STAGES = ["intake", "processing", "review", "approval", "delivery"]
+STAGE_INDEX = {stage: index for index, stage in enumerate(STAGES)}
+LAST_STAGE_INDEX = len(STAGES) - 1
+
+# Most model requests the processing stage keeps in flight at once; the rest queue locally
+# rather than running into the provider's rate limit and being retried
+OPENAI_MAX_INFLIGHT = int(os.environ.get("OPENAI_MAX_INFLIGHT", "8"))
+
+# Number of processed documents ProcessingAgent remembers (least recently used are dropped first)
+PROCESSING_CACHE_SIZE = 1024
 
 # Base class for workflow stage agents
 class WorkflowStageAgent(RoutedAgent):
@@ -107,6 +123,11 @@ class WorkflowStageAgent(RoutedAgent):
         super().__init__(description)
         self.stage = stage
         self.next_stage_topic = next_stage_topic
+        # Topics this stage publishes to, built once rather than per message
+        self._results_topic = TopicId(RESULTS_TOPIC_TYPE, source=stage)
+        self._next_topic = TopicId(next_stage_topic, source=stage) if next_stage_topic else None
+        # Metadata key under which this stage records its status
+        self._status_key = f"{stage}_status"
     
     async def process_task(self, task: WorkflowTask, ctx: MessageContext) -> WorkflowResult:
         """Process a task (to be implemented by subclasses)."""
@@ -114,31 +135,31 @@ class WorkflowStageAgent(RoutedAgent):
     
     async def handle_workflow_task(self, message: WorkflowTask, ctx: MessageContext) -> None:
         """Handle a workflow task."""
-        print(f"{self._description} ({self.stage}) processing task {message.task_id}")
+        log.info("%s (%s) processing task %s", self._description, self.stage, message.task_id)
         
         # Process the task
         result = await self.process_task(message, ctx)
         
         # Publish the result
-        await self.publish_message(
-            result, 
-            topic_id=TopicId(RESULTS_TOPIC_TYPE, source=self.stage)
-        )
+        results_pub = self.publish_message(result, topic_id=self._results_topic)
         
-        # Forward to the next stage if applicable
-        if self.next_stage_topic:
-            await self.publish_message(
+        # Forward to the next stage if applicable; the two publishes are independent
+        if self._next_topic is not None:
+            # The next stage gets its own copy: the incoming metadata plus this stage's additions
+            metadata = message.metadata.copy()
+            metadata.update(result.metadata)
+            metadata[self._status_key] = result.status
+            next_pub = self.publish_message(
                 WorkflowTask(
                     task_id=message.task_id,
                     content=result.content,
-                    metadata={
-                        **message.metadata, 
-                        **result.metadata, 
-                        f"{self.stage}_status": result.status
-                    }
+                    metadata=metadata
                 ),
-                topic_id=TopicId(self.next_stage_topic, source=self.stage)
+                topic_id=self._next_topic
             )
+            await asyncio.gather(results_pub, next_pub)
+        else:
+            await results_pub
 
 # Intake Agent
 @type_subscription(topic_type=INTAKE_TOPIC_TYPE)
@@ -165,7 +186,7 @@ class IntakeAgent(WorkflowStageAgent):
         
         # Add intake-specific metadata
         metadata = {
-            "intake_timestamp": "now",
+            "intake_timestamp": time.time_ns(),
             "intake_validation": "passed" if is_valid else "failed"
         }
         
@@ -183,6 +204,9 @@ class IntakeAgent(WorkflowStageAgent):
 class ProcessingAgent(WorkflowStageAgent):
     """Agent for the processing stage of the workflow."""
     
+    # The system message is the same for every task
+    SYSTEM_MESSAGE = SystemMessage(content="You are a helpful assistant that processes text.")
+    
     def __init__(self, model_client: Optional[OpenAIChatCompletionClient] = None) -> None:
         """Initialize the processing agent."""
         super().__init__(
@@ -191,6 +215,9 @@ class ProcessingAgent(WorkflowStageAgent):
             next_stage_topic=REVIEW_TOPIC_TYPE
         )
         self.model_client = model_client
+        self._sem = asyncio.Semaphore(OPENAI_MAX_INFLIGHT)
+        # Digest of task content -> AI-processed content, so repeated documents skip the model call
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
     
     @message_handler
     async def handle_task(self, message: WorkflowTask, ctx: MessageContext) -> None:
@@ -200,27 +227,40 @@ class ProcessingAgent(WorkflowStageAgent):
     async def process_task(self, task: WorkflowTask, ctx: MessageContext) -> WorkflowResult:
         """Process a task using AI if available."""
         processed_content = task.content
+        method = "ai" if self.model_client else "simple"
         
         # Process with AI if available
         if self.model_client:
-            try:
-                response = await self.model_client.create(
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant that processes text."},
-                        {"role": "user", "content": f"Process the following text: {task.content}"}
-                    ]
-                )
-                processed_content = response.content or processed_content
-            except Exception as e:
-                print(f"Error processing with AI: {e}")
+            key = hashlib.blake2b(task.content.encode(), digest_size=16).hexdigest()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                processed_content = cached
+                method = "cache"
+            else:
+                try:
+                    async with self._sem:
+                        response = await self.model_client.create(
+                            messages=[
+                                self.SYSTEM_MESSAGE,
+                                UserMessage(content=f"Process the following text: {task.content}", source="user")
+                            ]
+                        )
+                    if response.content:
+                        processed_content = response.content
+                        self._cache[key] = processed_content
+                        if len(self._cache) > PROCESSING_CACHE_SIZE:
+                            self._cache.popitem(last=False)
+                except Exception as e:
+                    log.warning("Error processing with AI: %s", e)
         else:
             # Simple processing without AI
             processed_content = f"Processed: {task.content}"
         
         # Add processing-specific metadata
         metadata = {
-            "processing_timestamp": "now",
-            "processing_method": "ai" if self.model_client else "simple"
+            "processing_timestamp": time.time_ns(),
+            "processing_method": method
         }
         
         # Return the result
@@ -258,7 +298,7 @@ class ReviewAgent(WorkflowStageAgent):
         
         # Add review-specific metadata
         metadata = {
-            "review_timestamp": "now",
+            "review_timestamp": time.time_ns(),
             "review_comments": review_comments
         }
         
@@ -297,7 +337,7 @@ class ApprovalAgent(WorkflowStageAgent):
         
         # Add approval-specific metadata
         metadata = {
-            "approval_timestamp": "now",
+            "approval_timestamp": time.time_ns(),
             "approval_notes": approval_notes
         }
         
@@ -335,7 +375,7 @@ class DeliveryAgent(WorkflowStageAgent):
         
         # Add delivery-specific metadata
         metadata = {
-            "delivery_timestamp": "now",
+            "delivery_timestamp": time.time_ns(),
             "delivery_method": delivery_method
         }
         
@@ -356,54 +396,57 @@ class WorkflowMonitor(RoutedAgent):
     def __init__(self) -> None:
         """Initialize the workflow monitor."""
         super().__init__("Workflow Monitor")
-        self.results: Dict[str, Dict[str, WorkflowResult]] = {}
+        # task id -> one slot per stage (in STAGES order), None until that stage reports
+        self.results: Dict[str, List[Optional[WorkflowResult]]] = {}
     
     @message_handler
     async def handle_result(self, message: WorkflowResult, ctx: MessageContext) -> None:
         """Handle a workflow result."""
         task_id = message.task_id
         stage = message.stage
+        stage_index = STAGE_INDEX[stage]
         
-        # Initialize task results if needed
-        if task_id not in self.results:
-            self.results[task_id] = {}
-        
-        # Store the result
-        self.results[task_id][stage] = message
+        # Store the result in the task's slot for this stage
+        task_results = self.results.get(task_id)
+        if task_results is None:
+            task_results = self.results[task_id] = [None] * len(STAGES)
+        task_results[stage_index] = message
         
         # Print progress
-        print(f"Monitor: Task {task_id} completed stage '{stage}' with status '{message.status}'")
+        log.info("Monitor: Task %s completed stage '%s' with status '%s'", task_id, stage, message.status)
         
         # Check if the task has completed all stages
-        if stage == STAGES[-1]:
-            print(f"\nTask {task_id} has completed the entire workflow!")
+        if stage_index == LAST_STAGE_INDEX:
+            log.info("\nTask %s has completed the entire workflow!", task_id)
             self.print_task_summary(task_id)
     
     def print_task_summary(self, task_id: str) -> None:
         """Print a summary of a task's journey through the workflow."""
         if task_id not in self.results:
-            print(f"No results found for task {task_id}")
+            log.info("No results found for task %s", task_id)
             return
         
         task_results = self.results[task_id]
         
-        print(f"\n{'='*50}")
-        print(f"Task {task_id} Summary")
-        print(f"{'='*50}")
-        for stage in STAGES:
-            if stage in task_results:
-                result = task_results[stage]
-                print(f"\nStage: {stage.upper()}")
-                print(f"  Status: {result.status}")
-                print(f"  Content: {result.content[:50]}..." if len(result.content) > 50 else f"  Content: {result.content}")
-                print(f"  Metadata: {result.metadata}")
+        log.info("\n%s", "=" * 50)
+        log.info("Task %s Summary", task_id)
+        log.info("%s", "=" * 50)
+        for stage, result in zip(STAGES, task_results):
+            if result is not None:
+                log.info("\nStage: %s", stage.upper())
+                log.info("  Status: %s", result.status)
+                if len(result.content) > 50:
+                    log.info("  Content: %s...", result.content[:50])
+                else:
+                    log.info("  Content: %s", result.content)
+                log.info("  Metadata: %s", result.metadata)
             else:
-                print(f"\nStage: {stage.upper()} - Not completed")
-        print(f"{'='*50}\n")
+                log.info("\nStage: %s - Not completed", stage.upper())
+        log.info("%s\n", "=" * 50)
 
 async def main() -> None:
     """Main function to demonstrate sequential workflow orchestration patterns."""
-    print("\n=== Sequential Workflow Example ===\n")
+    log.info("\n=== Sequential Workflow Example ===\n")
     
     # Create a model client (optional)
     use_ai = False
@@ -469,13 +512,11 @@ async def main() -> None:
         )
     ]
     
-    # Submit tasks to the intake stage
+    # Submit tasks to the intake stage; they are independent, so they are published together
     for task in tasks:
-        print(f"Submitting task {task.task_id} to workflow")
-        await runtime.publish_message(
-            task, 
-            topic_id=TopicId(INTAKE_TOPIC_TYPE, source="main")
-        )
+        log.info("Submitting task %s to workflow", task.task_id)
+    intake_topic = TopicId(INTAKE_TOPIC_TYPE, source="main")
+    await asyncio.gather(*(runtime.publish_message(task, topic_id=intake_topic) for task in tasks))
     
     # Wait for tasks to complete the workflow
     await runtime.stop_when_idle()
@@ -484,11 +525,15 @@ async def main() -> None:
     if model_client:
         await model_client.close()
     
-    print("\n=== Workflow completed ===")
+    log.info("\n=== Workflow completed ===")
 
 if __name__ == "__main__":
+    listener = start_queue_logging(log)
     try:
-        asyncio.run(main())
+        try:
+            run(main())
+        finally:
+            listener.stop()  # write out any queued output
     except KeyboardInterrupt:
         print("\nSequential workflow demo interrupted by user")
     except Exception as e:
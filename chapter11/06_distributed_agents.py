@@ -54,14 +54,14 @@ AutoGen Version: 0.5+
 # Standard library imports
 import argparse
 import asyncio
-import sys
+import logging
+import signal
+import uuid
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict
 
 # Third-party imports
 from autogen_core import (
-    AgentId,
     DefaultTopicId,
     MessageContext,
     RoutedAgent,
@@ -74,7 +74,15 @@ from autogen_ext.runtimes.grpc import (
 )
 
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
+from utils.queue_logging import start_queue_logging
+from utils.runtime import run
+
+# Demo output goes through a queue to a writer thread, so handlers never block on stdout.
+# Raise the level to logging.WARNING to silence it.
+log = logging.getLogger(__name__)
+
+# Longest time the client waits for its queries to be answered
+RESPONSE_TIMEOUT = 30.0  # seconds
 
 # Define message types
 @dataclass
@@ -101,7 +109,7 @@ class QueryProcessorAgent(RoutedAgent):
     @message_handler
     async def handle_query(self, message: QueryMessage, ctx: MessageContext) -> None:
         """Handle a query message."""
-        print(f"QueryProcessor: Processing query {message.query_id}: {message.content}")
+        log.info("QueryProcessor: Processing query %s: %s", message.query_id, message.content)
         
         # Simulate processing time
         await asyncio.sleep(2)
@@ -115,7 +123,7 @@ class QueryProcessorAgent(RoutedAgent):
             DefaultTopicId()
         )
         
-        print(f"QueryProcessor: Published response for query {message.query_id}")
+        log.info("QueryProcessor: Published response for query %s", message.query_id)
 
 @default_subscription
 class ResponseCollectorAgent(RoutedAgent):
@@ -128,13 +136,43 @@ class ResponseCollectorAgent(RoutedAgent):
     @message_handler
     async def handle_response(self, message: ResponseMessage, ctx: MessageContext) -> None:
         """Handle a response message."""
-        print(f"ResponseCollector: Received response for query {message.query_id} from {message.source}")
+        log.info("ResponseCollector: Received response for query %s from %s", message.query_id, message.source)
         self.responses[message.query_id] = message.content
-        print(f"ResponseCollector: Current responses: {self.responses}")
+        log.info("ResponseCollector: Current responses: %s", self.responses)
+
+@default_subscription
+class ResponseWaiterAgent(RoutedAgent):
+    """A client-side agent that resolves a future once every sent query has been answered."""
+    
+    def __init__(self, expected: int, done: "asyncio.Future[None]") -> None:
+        super().__init__("An agent that waits for query responses.")
+        self.expected = expected
+        self.done = done
+        # Each worker answers every query, so answered queries are counted by id
+        self.answered: set = set()
+    
+    @message_handler
+    async def handle_response(self, message: ResponseMessage, ctx: MessageContext) -> None:
+        """Count a response and resolve the future when all queries are answered."""
+        self.answered.add(message.query_id)
+        if len(self.answered) >= self.expected and not self.done.done():
+            self.done.set_result(None)
+
+async def wait_for_shutdown() -> None:
+    """Wait, without waking the event loop, until the process receives SIGINT or SIGTERM."""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows: no loop signal handlers; Ctrl+C cancels the wait via KeyboardInterrupt instead
+            pass
+    await stop_event.wait()
 
 async def run_host(port: int) -> None:
     """Run the host service that coordinates distributed agents."""
-    print(f"Starting host service on port {port}")
+    log.info("Starting host service on port %s", port)
     
     # Create a host service
     host = GrpcWorkerAgentRuntimeHost(address=f"localhost:{port}")
@@ -144,17 +182,15 @@ async def run_host(port: int) -> None:
     
     # Keep the host running
     try:
-        print(f"Host service started on port {port}. Press Ctrl+C to stop.")
-        while True:
-            await asyncio.sleep(1)
-    except KeyboardInterrupt:
-        print("Stopping host service...")
+        log.info("Host service started on port %s. Press Ctrl+C to stop.", port)
+        await wait_for_shutdown()
     finally:
+        log.info("Stopping host service...")
         await host.stop()
 
 async def run_worker(host_address: str, worker_id: str) -> None:
     """Run a worker runtime with a query processor agent."""
-    print(f"Starting worker runtime {worker_id} connecting to host at {host_address}")
+    log.info("Starting worker runtime %s connecting to host at %s", worker_id, host_address)
     
     # Create a worker runtime
     worker_runtime = GrpcWorkerAgentRuntime(host_address=host_address)
@@ -171,17 +207,15 @@ async def run_worker(host_address: str, worker_id: str) -> None:
     
     # Keep the worker running
     try:
-        print(f"Worker {worker_id} runtime started. Press Ctrl+C to stop.")
-        while True:
-            await asyncio.sleep(1)
-    except KeyboardInterrupt:
-        print(f"Stopping worker {worker_id} runtime...")
+        log.info("Worker %s runtime started. Press Ctrl+C to stop.", worker_id)
+        await wait_for_shutdown()
     finally:
+        log.info("Stopping worker %s runtime...", worker_id)
         await worker_runtime.stop()
 
 async def run_collector(host_address: str) -> None:
     """Run a worker runtime with a response collector agent."""
-    print(f"Starting collector runtime connecting to host at {host_address}")
+    log.info("Starting collector runtime connecting to host at %s", host_address)
     
     # Create a worker runtime
     collector_runtime = GrpcWorkerAgentRuntime(host_address=host_address)
@@ -198,17 +232,15 @@ async def run_collector(host_address: str) -> None:
     
     # Keep the worker running
     try:
-        print("Collector runtime started. Press Ctrl+C to stop.")
-        while True:
-            await asyncio.sleep(1)
-    except KeyboardInterrupt:
-        print("Stopping collector runtime...")
+        log.info("Collector runtime started. Press Ctrl+C to stop.")
+        await wait_for_shutdown()
     finally:
+        log.info("Stopping collector runtime...")
         await collector_runtime.stop()
 
 async def send_queries(host_address: str, num_queries: int) -> None:
     """Send queries to the distributed system."""
-    print(f"Connecting to host at {host_address} to send {num_queries} queries")
+    log.info("Connecting to host at %s to send %s queries", host_address, num_queries)
     
     # Create a client runtime to connect to the host
     client_runtime = GrpcWorkerAgentRuntime(host_address=host_address)
@@ -216,12 +248,21 @@ async def send_queries(host_address: str, num_queries: int) -> None:
     # Start the client
     await client_runtime.start()
     
+    # Listen for the responses, so the client can stop as soon as every query is answered.
+    # The type name is unique so several clients can be connected at once.
+    all_answered: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+    await ResponseWaiterAgent.register(
+        client_runtime,
+        f"response_waiter_{uuid.uuid4().hex[:8]}",
+        lambda: ResponseWaiterAgent(num_queries, all_answered)
+    )
+    
     # Send queries
     for i in range(num_queries):
         query_id = f"query_{i+1}"
         query_content = f"This is test query {i+1}"
         
-        print(f"Sending {query_id}: {query_content}")
+        log.info("Sending %s: %s", query_id, query_content)
         
         # Send the query to all query processor agents
         await client_runtime.publish_message(
@@ -233,7 +274,11 @@ async def send_queries(host_address: str, num_queries: int) -> None:
         await asyncio.sleep(1)
     
     # Wait for responses to be processed
-    await asyncio.sleep(5)
+    try:
+        await asyncio.wait_for(all_answered, RESPONSE_TIMEOUT)
+        log.info("All %s queries answered", num_queries)
+    except asyncio.TimeoutError:
+        log.warning("Timed out after %.0fs waiting for responses", RESPONSE_TIMEOUT)
     
     # Stop the client runtime
     await client_runtime.stop()
@@ -263,20 +308,26 @@ def main() -> None:
     
     args = parser.parse_args()
     
+    # run() installs the uvloop policy (when available) before the coroutine starts, so each
+    # gRPC runtime below is created, and runs its internal tasks, on that loop
     if args.mode == "host":
-        asyncio.run(run_host(args.port))
+        run(run_host(args.port))
     elif args.mode == "worker":
-        asyncio.run(run_worker(args.host, args.id))
+        run(run_worker(args.host, args.id))
     elif args.mode == "collector":
-        asyncio.run(run_collector(args.host))
+        run(run_collector(args.host))
     elif args.mode == "client":
-        asyncio.run(send_queries(args.host, args.queries))
+        run(send_queries(args.host, args.queries))
     else:
         parser.print_help()
 
 if __name__ == "__main__":
+    listener = start_queue_logging(log)
     try:
-        main()
+        try:
+            main()
+        finally:
+            listener.stop()  # write out any queued output
     except KeyboardInterrupt:
         print("\nDistributed agents demo interrupted by user")
     except Exception as e:
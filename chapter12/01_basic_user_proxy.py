@@ -42,19 +42,29 @@ AutoGen Version: 0.5+
 
 # Standard library imports
 import asyncio
-import sys
-from pathlib import Path
+from typing import Optional
 
 # Third-party imports
 from autogen_agentchat.agents import AssistantAgent, UserProxyAgent
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
 from autogen_agentchat.conditions import TextMentionTermination
+from autogen_core import CancellationToken
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 
 # Local imports
-sys.path.append(str(Path(__file__).parent.parent))
 from utils.config import get_openai_config
+from utils.runtime import run
+
+async def async_input(prompt: str = "", cancellation_token: Optional[CancellationToken] = None) -> str:
+    """Read a console line in a worker thread, so the event loop keeps running while the user types.
+
+    If the conversation is cancelled, the wait ends right away instead of at the next Enter.
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(input, prompt))
+    if cancellation_token is not None:
+        cancellation_token.link_future(future)
+    return await future
 
 async def main() -> None:
     """Main function to demonstrate basic UserProxyAgent integration patterns."""
@@ -77,7 +87,7 @@ async def main() -> None:
     user_proxy = UserProxyAgent(
         name="user_proxy",
         description="A user who requests and reviews poems",
-        input_func=input,  # Use standard input function for human input
+        input_func=async_input,  # Read human input without blocking the event loop
     )
     
     # Create a termination condition
@@ -99,7 +109,7 @@ async def main() -> None:
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
         print("\nBasic user proxy demo interrupted by user")
     except Exception as e:
@@ -0,0 +1,23 @@
+import asyncio
+
+from autogen_core.models import CreateResult, UserMessage
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+from utils.llm_cache import cached_client
+
+
+async def _stream(client, messages):
+    return [chunk async for chunk in client.create_stream(messages)]
+
+
+def test_streamed_response_is_cached(tmp_path):
+    inner = ReplayChatCompletionClient(["Hello from the model", "Second response"])
+    client = cached_client(inner, namespace="replay", directory=str(tmp_path))
+    messages = [UserMessage(content="Hi", source="user")]
+
+    first = asyncio.run(_stream(client, messages))
+    second = asyncio.run(_stream(client, messages))
+
+    # A miss would have streamed the replay client's second response
+    assert first[-1].content == second[-1].content == "Hello from the model"
+    assert isinstance(second[-1], CreateResult) and second[-1].cached
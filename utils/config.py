@@ -4,11 +4,27 @@
 #This important utility will be used to load the OpenAI API Key from the .env in all the files we are going to use.
 #Ensure the code is properly indented
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
-def get_openai_config():
-    """Load OpenAI configuration from environment variables."""
+
+@lru_cache(maxsize=1)
+def _load_openai_config():
     load_dotenv()
     return {
     "model": os.environ.get("OPENAI_MODEL", "gpt-4o"),
     "api_key": os.environ.get("OPENAI_API_KEY"),
     }
+
+def get_openai_config():
+    """Load OpenAI configuration from environment variables.
+
+    The .env file is only read on the first call; every call returns a fresh copy,
+    so callers may modify the dict without affecting each other.
+    """
+    return dict(_load_openai_config())
+
+# Directory for cached model responses (override with LLM_CACHE_DIR)
+LLM_CACHE_DIR = os.environ.get(
+    "LLM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".llm_cache"),
+)
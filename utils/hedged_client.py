@@ -0,0 +1,103 @@
+# utils/hedged_client.py
+# Tail-latency mitigation for model clients.
+# HedgedChatCompletionClient wraps any ChatCompletionClient. If a create() call has
+# not finished after a delay derived from recent latencies, a duplicate request is
+# fired and whichever finishes first wins; the slower one is cancelled.
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Optional, Sequence, Union
+
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,  # type: ignore
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+
+class HedgedChatCompletionClient(ChatCompletionClient):
+    """Wrap a model client and hedge slow ``create`` calls with a duplicate request.
+
+    The hedge delay is ``hedge_factor`` times the rolling P90 latency of the last
+    ``window`` successful calls. Until ``min_samples`` calls have completed,
+    ``initial_delay`` seconds is used instead. Streaming calls are passed through
+    unchanged.
+    """
+
+    def __init__(
+        self,
+        client: ChatCompletionClient,
+        hedge_factor: float = 0.8,
+        initial_delay: float = 5.0,
+        window: int = 50,
+        min_samples: int = 5,
+    ) -> None:
+        self._client = client
+        self._hedge_factor = hedge_factor
+        self._initial_delay = initial_delay
+        self._min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    @property
+    def hedge_delay(self) -> float:
+        """Seconds to wait before firing the duplicate request."""
+        if len(self._latencies) < self._min_samples:
+            return self._initial_delay
+        p90 = statistics.quantiles(self._latencies, n=10)[-1]
+        return self._hedge_factor * p90
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        start = time.perf_counter()
+        pending = {asyncio.ensure_future(self._client.create(messages, **kwargs))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay)
+            if not done:
+                # Primary is slow: race a duplicate request against it
+                pending.add(asyncio.ensure_future(self._client.create(messages, **kwargs)))
+            error: Optional[BaseException] = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        self._latencies.append(time.perf_counter() - start)
+                        return task.result()
+                    error = error or task.exception()
+                if not pending:
+                    assert error is not None
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def create_stream(
+        self, messages: Sequence[LLMMessage], **kwargs: Any
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        return self._client.create_stream(messages, **kwargs)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Union[Tool, ToolSchema]] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Union[Tool, ToolSchema]] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._client.capabilities  # type: ignore
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
@@ -0,0 +1,89 @@
+# utils/llm_cache.py
+# Exact-match response cache for the examples.
+# Re-running a tutorial script sends the same prompts every time; caching the
+# responses on disk means repeated runs return instantly and are not billed again.
+# Keys are SHA-256 digests of (messages, tools, json_output, create args), computed by
+# AutoGen's ChatCompletionCache; entries expire after a configurable TTL.
+import os
+from typing import Any, AsyncGenerator, List, Mapping, Optional, Sequence, Union
+
+from autogen_core import CacheStore, CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+from autogen_ext.models.cache import CHAT_CACHE_VALUE_TYPE, ChatCompletionCache
+from diskcache import Cache
+from pydantic import BaseModel
+
+from utils.config import LLM_CACHE_DIR
+
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+
+class FileCacheStore(CacheStore[CHAT_CACHE_VALUE_TYPE]):
+    """Disk-backed cache store whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, directory: str, ttl: Optional[float] = DEFAULT_TTL) -> None:
+        self._cache = Cache(directory)
+        self._ttl = ttl
+
+    def get(self, key: str, default: Optional[CHAT_CACHE_VALUE_TYPE] = None) -> Optional[CHAT_CACHE_VALUE_TYPE]:
+        return self._cache.get(key, default)
+
+    def set(self, key: str, value: CHAT_CACHE_VALUE_TYPE) -> None:
+        self._cache.set(key, value, expire=self._ttl)
+
+
+class StreamingChatCompletionCache(ChatCompletionCache):
+    """ChatCompletionCache that stores a streamed response once the stream has finished.
+
+    The base class stores an empty list before the first chunk and appends to it in memory,
+    which a disk store has already pickled, so streamed responses were never cached.
+    A stream that fails part-way is not stored either.
+    """
+
+    def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async def _generator() -> AsyncGenerator[Union[str, CreateResult], None]:
+            cached_result, cache_key = self._check_cache(messages, tools, json_output, extra_create_args)
+            if cached_result:
+                for result in cached_result:
+                    if isinstance(result, CreateResult):
+                        result.cached = True
+                    yield result
+                return
+
+            output_results: List[Union[str, CreateResult]] = []
+            async for result in self.client.create_stream(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            ):
+                output_results.append(result)
+                yield result
+            self.store.set(cache_key, output_results)
+
+        return _generator()
+
+
+def cached_client(
+    client: ChatCompletionClient,
+    namespace: str,
+    directory: str = LLM_CACHE_DIR,
+    ttl: Optional[float] = DEFAULT_TTL,
+) -> ChatCompletionClient:
+    """Wrap a model client so identical requests are served from the disk cache.
+
+    ``namespace`` (normally the model name) keeps responses from different models apart,
+    since the request key itself does not include the model.
+    """
+    store = FileCacheStore(os.path.join(directory, namespace), ttl)
+    return StreamingChatCompletionCache(client, store)
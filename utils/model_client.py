@@ -0,0 +1,115 @@
+# utils/model_client.py
+# Factory for the OpenAI model clients used throughout the examples.
+# All clients created on the same event loop share one pooled httpx.AsyncClient,
+# so sequential agent turns reuse warm keep-alive connections instead of paying a
+# fresh TCP + TLS handshake on every request. get_shared_model_client() goes one step
+# further and hands out the same client object for the same settings. Streaming
+# requests carry SSE headers so buffering proxies pass tokens through immediately.
+import asyncio
+import importlib.util
+import warnings
+import weakref
+from typing import Any, Dict, Tuple
+
+import httpx
+from autogen_core.models import ChatCompletionClient
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+from openai import DefaultAsyncHttpxClient
+
+from utils.config import get_openai_config
+from utils.hedged_client import HedgedChatCompletionClient
+
+# HTTP/2 multiplexing needs the optional "h2" package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=120)
+
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+# event loop -> settings key -> (model client, HTTP client it was built on)
+_model_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Tuple[ChatCompletionClient, httpx.AsyncClient]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Headers that stop proxies from buffering server-sent events
+SSE_HEADERS = {"Accept": "text/event-stream", "Cache-Control": "no-cache"}
+
+
+async def _add_sse_headers(request: httpx.Request) -> None:
+    """Send SSE_HEADERS on streaming completion requests."""
+    if request.method == "POST" and (b'"stream":true' in request.content or b'"stream": true' in request.content):
+        request.headers.update(SSE_HEADERS)
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    return DefaultAsyncHttpxClient(
+        http2=HTTP2_AVAILABLE,
+        limits=POOL_LIMITS,
+        event_hooks={"request": [_add_sse_headers]},
+    )
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Return the pooled HTTP client for the running event loop, creating it on first use."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No loop yet (module-level construction): nothing to share with
+        return _new_http_client()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _new_http_client()
+        _http_clients[loop] = client
+    return client
+
+
+def make_client(
+    config: Dict[str, Any], hedge: bool = False, cache: bool = False, **overrides: Any
+) -> ChatCompletionClient:
+    """Create an OpenAI model client on the shared connection pool.
+
+    ``overrides`` take precedence over ``config`` (e.g. ``model="gpt-4o-mini"``).
+    With ``hedge`` enabled the client is wrapped in HedgedChatCompletionClient (slow requests
+    are duplicated, and both copies are billed), so it is opt-in; with
+    ``cache`` enabled identical requests are answered from the on-disk response cache. The cache
+    needs the optional "cache" extra (pip install -e .[cache]); without it the client is
+    returned uncached, with a warning.
+    """
+    settings = {**config, **overrides}
+    client: ChatCompletionClient = OpenAIChatCompletionClient(
+        **settings,
+        http_client=get_shared_http_client(),
+    )
+    if hedge:
+        client = HedgedChatCompletionClient(client)
+    if cache:
+        # Imported here so diskcache is only required by scripts that cache
+        try:
+            from utils.llm_cache import cached_client
+        except ImportError:
+            warnings.warn("diskcache is not installed (pip install -e .[cache]); responses are not cached")
+        else:
+            client = cached_client(client, namespace=settings["model"])
+    return client
+
+
+def get_shared_model_client(hedge: bool = False, cache: bool = False, **overrides: Any) -> ChatCompletionClient:
+    """Return one make_client(get_openai_config(), ...) instance per event loop and settings.
+
+    A client is rebuilt once the shared HTTP client it was created on has been closed
+    (e.g. by an earlier ``await model_client.close()``).
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return make_client(get_openai_config(), hedge=hedge, cache=cache, **overrides)
+    # Overrides may hold unhashable values such as response_format dicts
+    key = repr((hedge, cache, sorted(overrides.items())))
+    clients = _model_clients.setdefault(loop, {})
+    http_client = get_shared_http_client()
+    entry = clients.get(key)
+    if entry is None or entry[1] is not http_client:
+        entry = (make_client(get_openai_config(), hedge=hedge, cache=cache, **overrides), http_client)
+        clients[key] = entry
+    return entry[0]
@@ -0,0 +1,43 @@
+# utils/queue_logging.py
+# Console output that never blocks the event loop.
+# print() inside an async handler is a synchronous write to stdout, and no other agent can
+# run until it returns. start_queue_logging() attaches a QueueHandler to a logger, so a log
+# call only enqueues the record; a QueueListener thread does the actual writing.
+# Records may carry an ``end`` extra (like print's ``end``) so streamed text can be written
+# without a newline after every chunk.
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Stream handler that ends each record with its ``end`` extra (default newline)."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.terminator = getattr(record, "end", "\n")
+        super().emit(record)
+
+
+def start_queue_logging(logger: logging.Logger, level: int = logging.INFO) -> QueueListener:
+    """Route ``logger``'s records through a queue to a console writer thread.
+
+    Call ``stop()`` on the returned listener at shutdown to write out the remaining records.
+    """
+    logger.addHandler(QueueHandler(_log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    listener = QueueListener(_log_queue, _ConsoleHandler(sys.stdout))
+    listener.start()
+    return listener
+
+
+def wait_for_console() -> None:
+    """Block until every queued record has been written.
+
+    Call this from a worker thread before prompting with input(), so the prompt appears
+    after the output that precedes it.
+    """
+    _log_queue.join()
@@ -0,0 +1,23 @@
+# utils/runtime.py
+# Entry-point helper for the examples.
+# run() behaves like asyncio.run() but uses uvloop's libuv-based event loop when
+# it is installed (pip install uvloop), which cuts per-task scheduling overhead
+# for streaming, tool calls and group-chat turns. Windows and environments
+# without uvloop fall back to the default asyncio loop.
+import asyncio
+import sys
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion, on uvloop when available."""
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(main)
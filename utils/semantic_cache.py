@@ -0,0 +1,88 @@
+# utils/semantic_cache.py
+# Similarity-based cache for agent runs.
+# Exact-match caching misses whenever a prompt changes by a single word, which is
+# common when one agent's (non-deterministic) reply is fed into the next turn.
+# SemanticCache embeds each task with an OpenAI embedding model and reuses a stored
+# TaskResult when a previous task for the same agent, model and system message is close
+# enough (cosine similarity >= threshold), so a changed prompt or model never replays an
+# old answer. Entries are persisted to a pickle file between runs.
+# Needs numpy, from the optional "cache" extra (pip install -e .[cache]).
+import os
+import pickle
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from autogen_agentchat.base import ChatAgent, TaskResult
+from autogen_agentchat.messages import BaseChatMessage
+from openai import AsyncOpenAI
+
+from utils.config import LLM_CACHE_DIR
+from utils.model_client import get_shared_http_client
+
+DEFAULT_CACHE_PATH = os.path.join(LLM_CACHE_DIR, "semantic.pkl")
+
+Task = Union[str, BaseChatMessage, Sequence[BaseChatMessage]]
+
+
+def task_text(task: Task) -> str:
+    """Flatten a run() task into the text that gets embedded."""
+    if isinstance(task, str):
+        return task
+    if isinstance(task, BaseChatMessage):
+        return task.to_text()
+    return "\n".join(message.to_text() for message in task)
+
+
+class SemanticCache:
+    """Reuse an agent's earlier result for tasks that are semantically equivalent."""
+
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        path: str = DEFAULT_CACHE_PATH,
+        threshold: float = 0.92,
+        embedding_model: str = "text-embedding-3-small",
+    ) -> None:
+        self._model = model
+        self._api_key = api_key
+        self._path = path
+        self._threshold = threshold
+        self._embedding_model = embedding_model
+        # (agent name, model, system message) -> list of (unit embedding, normalized task, result)
+        self._entries: Dict[Tuple[str, str, str], List[Tuple[np.ndarray, str, TaskResult]]] = {}
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self._entries = pickle.load(f)
+
+    async def _embed(self, text: str) -> np.ndarray:
+        client = AsyncOpenAI(api_key=self._api_key, http_client=get_shared_http_client())
+        response = await client.embeddings.create(model=self._embedding_model, input=text)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        with open(self._path, "wb") as f:
+            pickle.dump(self._entries, f)
+
+    def _agent_key(self, agent: ChatAgent) -> Tuple[str, str, str]:
+        # AssistantAgent keeps its system message in _system_messages; other agents have none
+        system_message = "\n".join(str(message.content) for message in getattr(agent, "_system_messages", ()))
+        return (agent.name, self._model, system_message)
+
+    async def run(self, agent: ChatAgent, task: Task) -> TaskResult:
+        """Return a cached result for a similar task, or run the agent and cache its result."""
+        text = " ".join(task_text(task).split()).lower()
+        embedding = await self._embed(text)
+        entries = self._entries.setdefault(self._agent_key(agent), [])
+        if entries:
+            # Inner product of unit vectors is the cosine similarity
+            scores = np.stack([entry[0] for entry in entries]) @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] >= self._threshold:
+                return entries[best][2]
+        result = await agent.run(task=task)
+        entries.append((embedding, text, result))
+        self._save()
+        return result
@@ -0,0 +1,50 @@
+# utils/streaming.py
+# Output helpers for streamed agent events.
+# Printing every event as it arrives costs one write per event; at high event rates
+# that per-event overhead dominates. coalesce() batches events into larger chunks
+# so the caller can emit them with a single write.
+import asyncio
+import time
+from typing import Any, AsyncIterable, AsyncIterator, List
+
+
+async def coalesce(stream: AsyncIterable[Any], max_chars: int = 256, max_ms: float = 50) -> AsyncIterator[str]:
+    """Batch the string form of stream items into chunks.
+
+    A chunk is emitted once it holds ``max_chars`` characters or its oldest item has
+    waited ``max_ms`` milliseconds, whichever comes first. Whatever is left is
+    emitted when the stream ends, or before its error is re-raised if it fails.
+    """
+    iterator = stream.__aiter__()
+    buffer: List[str] = []
+    size = 0
+    deadline = None
+    next_item = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = await asyncio.wait({next_item}, timeout=timeout)
+            if done:
+                try:
+                    item = next_item.result()
+                except StopAsyncIteration:
+                    break
+                except Exception:
+                    # The partial output is what the user needs to see when the stream fails
+                    if buffer:
+                        yield "".join(buffer)
+                    raise
+                text = str(item)
+                buffer.append(text)
+                size += len(text)
+                if deadline is None:
+                    deadline = time.monotonic() + max_ms / 1000
+                next_item = asyncio.ensure_future(iterator.__anext__())
+            # Flush on size, or because the wait timed out with items pending
+            if size >= max_chars or not done:
+                yield "".join(buffer)
+                buffer, size, deadline = [], 0, None
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        next_item.cancel()